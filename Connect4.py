@@ -8,6 +8,7 @@ from Scenes.Match import run_match
 from Scenes.Menu import run_menu
 from Scenes.Instruction import run_instruction
 from Scenes.Game_over import run_game_over
+from Scenes.Replay import run_replay
 
 from Objects.Screen import Screen
 
@@ -49,6 +50,8 @@ def game_loop(game_state, screen):
             game_state, winner = run_match(game_state, screen)
         elif game_state == 'game over': # game over scene
             game_state = run_game_over(screen, winner)
+        elif game_state == 'replay': # replay scene
+            game_state = run_replay(screen)
         elif game_state == 'exit': # exit procedures
             pygame.quit()
             break
@@ -0,0 +1,171 @@
+# This file contains the functions determining the winner of many states at once
+
+# The functions of this file apply the rules of the method winner of Position
+# to a whole batch of states in a single vectorized pass with NumPy, for the
+# tools working on thousands of states at a time (self-play, datasets). They
+# need the NumPy module, which the game itself does not use.
+#
+# A batch of states is given either as an array of boards of shape (N, rows,
+# columns), where the rows are counted from the bottom and each cell holds
+# empty, red_cell or yellow_cell, or as an array of shape (N, 2) holding the
+# bitboards of the red and yellow pieces of each state, laid out like the
+# attribute masks of Position.
+#
+# The result of each state is one of none, red_wins, yellow_wins or tied. As
+# for the method check_winner of Board, a state where both colours have a
+# sequence of 4 is tied and has no winner.
+
+import numpy
+
+from Objects.Position import four_windows
+
+# values of the cells of an array of boards
+empty = 0
+red_cell = 1
+yellow_cell = 2
+
+# results of a state
+none = 0 # no colour has a sequence of 4
+red_wins = 1 # only red has a sequence of 4
+yellow_wins = 2 # only yellow has a sequence of 4
+tied = 3 # both colours have a sequence of 4
+
+# line masks of each size of board, keyed by (rows, columns)
+_masks_cache = {}
+
+'''
+Return the line masks of a board: a matrix with one line per sequence of 4
+cells, holding 1 in the cells of the sequence and 0 elsewhere. The cells are
+numbered row by row from the bottom, like the cells of a flattened array of
+boards.
+
+Arguments:
+    row (int): the number of rows
+    column (int): the number of columns
+
+Returns:
+    masks (numpy.ndarray): float32 matrix of shape (sequences, rows * columns),
+                           so the products by the masks run on the fast
+                           matrix routines of NumPy
+'''
+def line_masks(row, column):
+    if (row, column) not in _masks_cache:
+        windows, cell_windows = four_windows(row, column)
+        masks = numpy.zeros((len(windows), row * column), numpy.float32)
+        for i, window in enumerate(windows):
+            for c in range(column):
+                for r in range(row):
+                    if window >> (c * (row + 1) + r) & 1:
+                        masks[i, r * column + c] = 1
+        _masks_cache[(row, column)] = masks
+
+    return _masks_cache[(row, column)]
+
+
+'''
+Combine whether each colour has a sequence of 4 into the result of each state.
+
+Arguments:
+    red_four (numpy.ndarray): bool array, set where red has a sequence of 4
+    yellow_four (numpy.ndarray): bool array, set where yellow has a sequence of 4
+
+Returns:
+    results (numpy.ndarray): int8 array holding the result of each state
+'''
+def _results(red_four, yellow_four):
+    return red_four.astype(numpy.int8) * red_wins + \
+           yellow_four.astype(numpy.int8) * yellow_wins
+
+
+'''
+Determine the result of a batch of states given as an array of boards. The
+pieces of each colour are counted in every sequence of 4 cells with a single
+product by the line masks.
+
+Arguments:
+    boards (numpy.ndarray): int8 array of shape (N, rows, columns)
+
+Returns:
+    results (numpy.ndarray): int8 array of shape (N,) holding the result of
+                             each state
+'''
+def board_winners(boards):
+    count, row, column = boards.shape
+    masks = line_masks(row, column).T
+    cells = boards.reshape(count, row * column)
+    red_four = ((cells == red_cell).astype(numpy.float32) @ masks == 4).any(1)
+    yellow_four = ((cells == yellow_cell).astype(numpy.float32) @ masks
+                   == 4).any(1)
+    return _results(red_four, yellow_four)
+
+
+'''
+Determine if each bitboard of an array contains a sequence of 4 connected
+pieces, with the shifts used by the method connected_four of Position.
+
+Arguments:
+    masks (numpy.ndarray): uint64 array of bitboards of a single colour
+    row (int): the number of rows
+
+Returns:
+    fours (numpy.ndarray): bool array, set where a sequence of 4 is present
+'''
+def _connected_four(masks, row):
+    fours = numpy.zeros(masks.shape, bool)
+    for shift in (1, row + 1, row, row + 2):
+        shift = numpy.uint64(shift)
+        pairs = masks & (masks >> shift)
+        fours |= (pairs & (pairs >> (shift + shift))) != 0
+    return fours
+
+
+'''
+Determine the result of a batch of states given as their bitboards.
+
+Arguments:
+    masks (numpy.ndarray): uint64 array of shape (N, 2) holding the bitboards
+                           of the red and yellow pieces of each state
+    row (int): the number of rows of the board
+
+Returns:
+    results (numpy.ndarray): int8 array of shape (N,) holding the result of
+                             each state
+'''
+def bitboard_winners(masks, row = 6):
+    masks = numpy.asarray(masks, numpy.uint64)
+    return _results(_connected_four(masks[:, 0], row),
+                    _connected_four(masks[:, 1], row))
+
+
+'''
+Convert states into an array of boards.
+
+Arguments:
+    positions (list): instances of Position of the same size
+
+Returns:
+    boards (numpy.ndarray): int8 array of shape (N, rows, columns)
+'''
+def to_boards(positions):
+    row = positions[0].row
+    column = positions[0].column
+    boards = numpy.zeros((len(positions), row, column), numpy.int8)
+    for n, position in enumerate(positions):
+        for c in range(column):
+            for r in range(position.heights[c]):
+                boards[n, r, c] = position.owner(c, r) + 1
+    return boards
+
+
+'''
+Convert states into an array of bitboards.
+
+Arguments:
+    positions (list): instances of Position of the same size
+
+Returns:
+    masks (numpy.ndarray): uint64 array of shape (N, 2)
+'''
+def to_bitboards(positions):
+    return numpy.array([position.masks for position in positions],
+                       numpy.uint64)
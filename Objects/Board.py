@@ -1,19 +1,26 @@
 # This file contains all attributes and methods of the class Board
 
 # Board represents the casing which holds the pieces that the players have
-# placed. It is on the screen as a blue rectangular casing with 7 x 6 black
-# circles representing the holes. Beside acting as a holder of pieces, it also
-# acts as a referee of a match and will announce a winner when one and only one
-# colour has achieved a sequence of 4 connected pieces.
+# placed. It is on the screen as a blue rectangular casing with 7 x 6 holes,
+# drawn over the pieces from a surface rendered once. Beside acting as a holder
+# of pieces, it also acts as a referee of a match and will announce a winner
+# when one and only one colour has achieved a sequence of 4 connected pieces.
 
 import pygame
 
+from Objects.Piece import Piece
+from Objects.Position import Position, colours
+
 # global identifiers each representing a RGB colour
 blue = (0,0,255)
 black = (0,0,0)
 red = (255, 0, 0)
 yellow = (255, 255, 0)
 
+# surfaces of the casing drawn so far, keyed by the size of the window and of
+# the board
+_casings = {}
+
 class Board():
     def __init__(self, screen, row, column, c_radius):
         self._row = row # the number of rows
@@ -21,130 +28,285 @@ class Board():
         self.c_radius = c_radius # the radius of each hole
         self.unit_size = int(screen.width / 7) # the spacing between the
                                                # the center of each hole
+        self._height = screen.height # the height of the window
+        self.position = Position(row, column) # logical state of the match
+        self._lines = [set(), set()] # completed sequences of red and yellow
+        self._winner = None # result of the last check, cached between frames
+        self._stacks = [[] for c in range(column)] # instances of Piece in each
+                                                   # column, from the bottom up
+        self._falling = 0 # number of instances of Piece yet to land
+        self.moves = [] # moves played in the match, numbered like in the
+                        # method moves of Position, None for a turn lost to
+                        # the timer
+
+
+    '''
+    Determine the column of the board located at the given x position.
+
+    Arguments:
+        x (int): x position in pixels
+
+    Returns:
+        column (int): column of the board, counted from the left
+    '''
+    def column_of(self, x):
+        return int(x // self.unit_size)
+
+
+    '''
+    Determine the row of the board located at the given y position.
+
+    Arguments:
+        y (int): y position in pixels
+
+    Returns:
+        row (int): row of the board, counted from the bottom
+    '''
+    def row_of(self, y):
+        return int((self._height - y) // self.unit_size)
+
+
+    '''
+    Determine the y position of the center of the holes in the given row.
+
+    Arguments:
+        row (int): row of the board, counted from the bottom
+
+    Returns:
+        y (int): y position in pixels
+    '''
+    def y_of(self, row):
+        return int(self._height - self.unit_size * (row + 0.5))
+
+
+    '''
+    Determine if every instance of Piece in the match has landed.
+
+    Arguments:
+        None
+
+    Returns:
+        True if no instance of Piece is falling. Otherwise, False.
+    '''
+    def is_settled(self):
+        return self._falling == 0
+
+
+    '''
+    Drop a piece into the given column and instantiate a Piece animating it.
+    The landing y position of the new instance of Piece is known from the
+    height of the column, so it never has to look for other pieces below.
+    The caller must make sure the column is not full.
+
+    Arguments:
+        pieces (list): all existing instances of Piece
+        column (int): column to drop the piece into
+        colour (tuple): colour of the piece as a rgb combination
+        y (int): initial y position of the instance of Piece
+
+    Returns:
+        None
+    '''
+    def add_piece(self, pieces, column, colour, y):
+        row = self.position.drop(column, colours.index(colour))
+        self.moves.append(column)
+        piece = Piece((int(self.unit_size * (column + 0.5)), y), self.c_radius,
+                      colour, self.y_of(row))
+        self._stacks[column].append(piece)
+        pieces.append(piece)
+        self._falling += 1
+
+
+    '''
+    Pop out the piece at the bottom of the given column and remove the instance
+    of Piece animating it. Every instance of Piece above falls by 1 unit, and
+    every recorded sequence passing through the column is forgotten; the pieces
+    above are checked again by piece_landed once they become stationary, and
+    no winner is announced by check_winner until then. The caller must make
+    sure the bottom piece belongs to the popping player.
+
+    Arguments:
+        pieces (list): all existing instances of Piece
+        column (int): column to pop the piece from
+
+    Returns:
+        None
+    '''
+    def pop_piece(self, pieces, column):
+        self.position.pop(column)
+        self.moves.append(self._column + column)
+
+        stack = self._stacks[column]
+        pieces.remove(stack.pop(0))
+        for row, piece in enumerate(stack):
+            piece.landing_y = self.y_of(row)
+            piece.is_stationary = False
+        self._falling += len(stack)
+
+        column_mask = self.position.column_mask(column)
+        for lines in self._lines:
+            for window in [w for w in lines if w & column_mask]:
+                lines.remove(window)
+        self._referee()
+
+
+    '''
+    Replace the state of the match by the given one at once, without any
+    falling animation: every instance of Piece is replaced by a stationary one,
+    and the sequences of 4 connected pieces are found again.
 
+    Arguments:
+        pieces (list): all existing instances of Piece
+        position (Position): the new state of the match
 
+    Returns:
+        None
     '''
-    Draw the single blue rectangle representing
-    the casing of the board on the screen.
+    def set_position(self, pieces, position):
+        self.position = position.copy()
+        pieces.clear()
+        self._stacks = [[] for c in range(self._column)]
+        for c in range(self._column):
+            for r in range(position.heights[c]):
+                y = self.y_of(r)
+                piece = Piece((int(self.unit_size * (c + 0.5)), y),
+                              self.c_radius, colours[position.owner(c, r)], y)
+                piece.is_stationary = True
+                self._stacks[c].append(piece)
+                pieces.append(piece)
+        self._falling = 0
+
+        self._lines = [set(window for window in position.windows
+                           if mask & window == window)
+                       for mask in position.masks]
+        self._referee()
+
+
+    '''
+    Record a turn lost to the timer, or passed for lack of a legal move, which
+    leaves the board as it is.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def record_timeout(self):
+        self.moves.append(None)
+
+
+    '''
+    Return the casing of the board drawn on a surface of its own: a blue
+    rectangle with 7 x 6 transparent circles representing the holes. The
+    surface is drawn only once for each size of window and board, and kept
+    for every later match.
     
     Arguments:
         screen (Screen): an instance of pygame class Screen
     
     Returns:
-        None
-    '''    
-    def draw_rect(self, screen):
-        pygame.draw.rect(screen.surface, blue, (0, self.unit_size, screen.width,
-                                                screen.height - self.unit_size))
+        casing (pygame.Surface): the surface of the casing
+    '''
+    def _casing(self, screen):
+        key = (screen.width, screen.height, self.unit_size, self._row,
+               self._column, self.c_radius)
+        if key not in _casings:
+            casing = pygame.Surface((screen.width,
+                                     screen.height - self.unit_size))
+            casing.fill(blue)
+            for c in range(self._column):
+                for r in range(self._row):
+                    pygame.draw.circle(casing, black,
+                                       (int(self.unit_size * (c + 0.5)),
+                                        int(self.unit_size * (r + 0.5))),
+                                       self.c_radius)
+            # the black holes are left out when the casing is drawn, so the
+            # pieces drawn before it show through
+            casing.set_colorkey(black)
+            _casings[key] = casing.convert()
+        return _casings[key]
 
 
     '''
-    Draw 42 black circles in a uniformly distributed 6 x 7 grid representing
-    the holes of the game board.
+    Draw the casing of the board on the screen with a single blit. It is drawn
+    over the pieces, which are seen through its holes.
     
     Arguments:
         screen (Screen): an instance of pygame class Screen
     
     Returns:
         None
-    '''    
-    def draw_holes(self, screen):
-        for c in range(self._column):
-            for r in range(self._row):
-                c_pos = {'x': int(self.unit_size * (c + 0.5)),
-                         'y': int(self.unit_size * (r + 1.5))}
-                pygame.draw.circle(screen.surface, black, 
-                                   (c_pos['x'], c_pos['y']), self.c_radius)
-    
+    '''
+    def draw(self, screen):
+        screen.surface.blit(self._casing(screen), (0, self.unit_size))
+
+
+    '''
+    Check the 4 orientations passing through an instance of Piece which has
+    just become stationary, and record every sequence of 4 connected pieces it
+    has completed. Only these sequences can be affected by the landing piece,
+    so the rest of the board is never scanned again.
+
+    Arguments:
+        piece (Piece): an instance of Piece that has just become stationary
+
+    Returns:
+        None
+    '''
+    def piece_landed(self, piece):
+        self._falling -= 1
+        player = colours.index(piece.colour)
+        mask = self.position.masks[player]
+        for window in self.position.windows_through(self.column_of(piece.x),
+                                                    self.row_of(piece.y)):
+            if mask & window == window:
+                self._lines[player].add(window)
+        self._referee()
+
 
     '''
-    Determine if a winner is present from the list "pieces" which contains the
-    all instances of Piece in their current state.
+    Update the cached winner from the recorded sequences of 4 connected pieces.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def _referee(self):
+        if self._lines[0] and self._lines[1]:
+            self._winner = 'tied'
+        elif self._lines[0]:
+            self._winner = 'red'
+        elif self._lines[1]:
+            self._winner = 'yellow'
+        else:
+            self._winner = None
+
+
+    '''
+    Determine if a winner is present in the current state of the match. The
+    result is maintained incrementally by piece_landed and pop_piece, so
+    this method does not scan the board.
     
     The winner, either 'red' or 'yellow', is declared when one of them achieves
     a sequence of 4 pieces connected in either vertical, horizontal, negative
     diagonal, or positive diagonal orientation.
     
     If both colours achieve a sequence of 4 in the current state, then it is
-    considered 'tied', and no winner is announced.
+    considered 'tied', and no winner is announced. No winner is announced
+    either while a piece is still falling, as the sequences of the pieces
+    falling after a pop-out are only found once they have landed.
     
     Arguments:
-        pieces (list): all existing instances of Piece
+        None
     
     Returns:
         winner (str or None): 'red' or 'yellow' representing the winner of the
                               match. If no winner exists, it is set to None.
     '''                
-    def check_winner(self, pieces):
-        winner = None
-        
-        # check all existing instance of Piece (p1) with all other instances
-        # of Pieces (p2) for alignment, and place the distinguishing attribute
-        # of the instance of Piece in the appropriate array (ver, hor, n_dia,
-        # p_dia). The comparison is done for stationary instance of Piece only.
-        for p1 in pieces:
-            ver = [p1.y] # pieces aligned vertically with p1
-            hor = [p1.x] # pieces aligned horizontally with p1
-            n_dia = [p1.x] # pieces aligned negative diagonally with p1
-            p_dia = [p1.x] # pieces aligned positive diagonally with p1
-           
-            if p1.is_stationary:
-                for p2 in pieces:
-                    if p1.colour == p2.colour and p2.is_stationary:
-                        if p1.x == p2.x and p1.y != p2.y:
-                            ver.append(p2.y)
-                        elif p1.y == p2.y and p1.x != p2.x:
-                            hor.append(p2.x)
-                        elif p1.x != p2.x and (p2.y - p1.y)/(p2.x - p1.x) == 1:
-                            n_dia.append(p2.x)
-                        elif p1.x != p2.x and (p2.y - p1.y)/(p2.x - p1.x) == -1:
-                            p_dia.append(p2.x)
-
-                # place the all resulting arrays into a single array to
-                # allow for looping
-                aligned = [ver, hor, n_dia, p_dia]
-                for _aligned in aligned:
-                    counter = 0
-                    
-                    # if 4 or more pieces are aligned in the given orientation
-                    # then proceed to sort the position values in the given
-                    # array in an increasing order.
-                    if len(_aligned) >= 4:
-                        _aligned.sort()
-                        
-                        # loop through each number starting from index 1,
-                        # if the difference between the current and previous
-                        # position value is equal to the distance between the
-                        # center of the holes, then increment the counter
-                        # representing the number of connected pieces by 1.
-                        # Otherwise, reset the counter since the sequence
-                        # has been broken.
-                        for i in range(1, len(_aligned)):
-                            if _aligned[i] - _aligned[i-1] == self.unit_size:
-                                counter += 1
-                            else:
-                                counter = 0
-                            
-                            # If the counter reaches 3, which means that a
-                            # sequence of 4 connect pieces is achieved, the
-                            # colour of the pieces is assigned to the variable
-                            # "winner". However, If the opposing player has
-                            # also achieved a sequence of 4 connected pieces
-                            # at the current state of the match, then the
-                            # winner is assigned 'tied'.
-                            if counter == 3:
-                                if winner != 'tied' and \
-                                   (winner is None or winner == p1.colour):
-                                    winner = p1.colour
-                                else:
-                                    winner = 'tied'
-
-        # After checking all pieces (p1), return the winner of match.
-        # If no winner exist or the match is 'tied' at the current state
-        # of the match, return None.
-        if winner == red:
-            return 'red'
-        elif winner == yellow:
-            return 'yellow'
-        elif winner == 'tied':
+    def check_winner(self):
+        if self._winner == 'tied' or not self.is_settled():
             return None
+        return self._winner
@@ -0,0 +1,165 @@
+# This file contains all attributes and methods of the class Clock
+
+# Clock paces the loop of a scene. The state of a scene, such as the falling
+# pieces or the timer of the player, is updated in ticks of a fixed length (50
+# ticks per second), while the scene is drawn once per frame, at most max_fps
+# frames per second. At the start of each frame, the method tick returns how
+# many ticks of time have passed since the last frame, and the scene updates
+# its state that many times. A piece therefore falls at the same speed whether
+# the frames are fast or slow, and a slow frame is followed by the next one at
+# once instead of by a fixed wait.
+#
+# When nothing in the scene is moving, the scene sleeps with the method wait
+# until an input arrives, or until the tick where something changes next, such
+# as the timer of the player, instead of drawing identical frames. The scenes
+# without any animation sleep with the function wait_event until an input
+# arrives.
+#
+# Both sleep in pygame.event.wait, which removes the event it returns from the
+# event queue. The method wait leaves the input on the event queue for the
+# scene to handle, so it puts that event back in front of the events queued
+# after it, keeping the inputs in the order they arrived. The event queue is
+# not checked with pygame.event.peek instead, as in pygame 2 it loses the
+# attributes of an event posted from another thread, such as the one of the
+# computer finding its move.
+#
+# The length of the recent frames is kept, to measure the frames per second and
+# the percentiles of the frame time. The time slept in wait is not counted as
+# part of a frame.
+
+import collections
+
+import pygame
+
+'''
+Sleep until an event arrives, or until the timeout has passed, and remove the
+event from the event queue.
+
+Arguments:
+    timeout (int): the most milliseconds to sleep for. None to sleep until an
+                   event arrives.
+
+Returns:
+    event (pygame.event.Event): the event removed from the event queue. An
+                                event of type pygame.NOEVENT if none arrived.
+'''
+def wait_event(timeout = None):
+    if timeout is None:
+        return pygame.event.wait()
+    if timeout < 1:
+        return pygame.event.poll()
+    return pygame.event.wait(timeout)
+
+
+class Clock():
+    def __init__(self, tick_rate = 50, max_fps = 50, max_ticks = 5,
+                 history = 200):
+        self._clock = pygame.time.Clock()
+        self._tick_ms = 1000 / tick_rate # length of a tick in milliseconds
+        self._max_fps = max_fps # 0 for no limit on the frames per second
+        self._max_ticks = max_ticks # most ticks run in a single frame
+        self._lag = 0 # time passed but not yet run as ticks, in milliseconds
+        self._frames = collections.deque(maxlen = history) # recent frame times
+        self._last = pygame.time.get_ticks() # time of the start of the frame
+        self._slept = 0 # time slept in wait during the frame
+        self._skipped = 0 # time slept during the frame not to be run as ticks
+        self._clock.tick()
+
+
+    '''
+    Start a new frame, waiting first if the last frame was shorter than
+    allowed by max_fps. Return the number of ticks to run in this frame. After
+    a very slow frame, such as while a new scene is set up, at most max_ticks
+    ticks are run and the rest of the time is dropped, so the scene does not
+    jump ahead.
+
+    Arguments:
+        None
+
+    Returns:
+        ticks (int): the number of ticks passed since the last frame
+    '''
+    def tick(self):
+        frame_time = self._clock.tick(self._max_fps)
+        self._frames.append(max(0, frame_time - self._slept))
+        self._last = pygame.time.get_ticks()
+
+        self._lag += max(0, frame_time - self._skipped)
+        self._slept = 0
+        self._skipped = 0
+        ticks = int(self._lag // self._tick_ms)
+        self._lag -= ticks * self._tick_ms
+        if ticks > self._max_ticks:
+            ticks = self._max_ticks
+            self._lag = 0
+        return ticks
+
+
+    '''
+    Sleep until an event arrives, which is left on the event queue, or until
+    the given number of ticks have passed since the start of the frame. With no
+    number of ticks, nothing in the scene depends on the time slept, so it is
+    not run as ticks by the next call of the method tick.
+
+    Arguments:
+        ticks (int): the most ticks to sleep for. None to sleep until an event
+                     arrives.
+
+    Returns:
+        None
+    '''
+    def wait(self, ticks = None):
+        start = pygame.time.get_ticks()
+        timeout = None
+        if ticks is not None:
+            timeout = ticks * self._tick_ms - self._lag - (start - self._last)
+            if timeout < 1:
+                return
+        event = wait_event(None if timeout is None else int(timeout))
+        if event.type != pygame.NOEVENT:
+            # put the event back in front of the ones queued after it
+            for queued in [event] + pygame.event.get():
+                pygame.event.post(queued)
+
+        slept = pygame.time.get_ticks() - start
+        self._slept += slept
+        if ticks is None:
+            self._skipped += slept
+
+
+    '''
+    Return the measured frames per second over the recent frames.
+
+    Arguments:
+        None
+
+    Returns:
+        fps (float): the frames per second. 0 before the first frame.
+    '''
+    def fps(self):
+        total = sum(self._frames)
+        if total == 0:
+            return 0
+        return 1000 * len(self._frames) / total
+
+
+    '''
+    Return percentiles of the time of the recent frames, by the nearest rank.
+
+    Arguments:
+        percents (tuple): the percentiles to return, from 0 to 100
+
+    Returns:
+        percentiles (dict): the frame time in milliseconds of each percentile.
+                            Empty before the first frame.
+    '''
+    def frame_times(self, percents = (50, 95, 99)):
+        frames = sorted(self._frames)
+        if not frames:
+            return {}
+        percentiles = {}
+        for percent in percents:
+            rank = max(0, min(len(frames) - 1,
+                              round(percent / 100 * len(frames)) - 1))
+            percentiles[percent] = frames[rank]
+        return percentiles
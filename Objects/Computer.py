@@ -1,112 +1,341 @@
-import numpy
-import pygame
+# This file contains all attributes and methods of the class Computer
+
+# Computer is the opponent of the player in a single-player (pve) match. It
+# plays the yellow pieces, choosing its moves with an instance of Engine that
+# searches the logical state of the match held by the instance of Board.
+# The search deepens iteratively until a time budget runs out, so the time
+# taken by each move is predictable however complex the state. The results of
+# its searches are kept in a transposition table of fixed size, which is reused
+# from one move to the next. The statistics of the last search, including the
+# number of nodes visited per second and the counters of the transposition
+# table, are kept in the attribute "stats".
+#
+# In the match scene, the search runs on a background thread so the scene
+# keeps drawing and handling inputs while the computer is thinking. The match
+# scene checks for the finished move every tick, and cancels the search if the
+# player leaves the match. A function passed as "notify" is called from the
+# background thread as soon as the move is found, so the match scene can sleep
+# until then instead of checking.
+#
+# While the player is thinking, the computer ponders: it guesses the likely
+# moves of the player and searches its reply to each of them in advance. When
+# the player's move matches one of them, the reply is played at once, and any
+# other move still benefits from the entries left in the transposition table.
+#
+# The first moves of a match are answered at once from an opening book, when
+# the book file is available.
+#
+# The search can also be a Monte Carlo tree search (an instance of Mcts), which
+# scores the states by playing random matches instead of evaluating them, with
+# a budget of playouts for each move.
+#
+# Every instance of Computer owns its random number generator, created from an
+# explicit seed or passed in, and never uses the global one of the module
+# random. Two computers with the same seed and settings play the same moves,
+# provided their searches are limited by depth or by playouts rather than by
+# time (time_budget set to None).
+
+import os
 import random
-import math
-import collections
+import threading
 
-from Objects.Piece import Piece
+from Objects.Engine import Engine
+from Objects.Game_archive import no_seed
+from Objects.Mcts import Mcts
+from Objects.Opening_book import Opening_book, default_path
+from Objects.Parallel_engine import Parallel_engine
+from Objects.Position import colours
+from Objects.Transposition_table import Transposition_table
 
 # global identifiers each representing a RGB colour
-blue = (0,0,255)
-black = (0,0,0)
-red = (255, 0, 0)
 yellow = (255, 255, 0)
 
-class Computer(): 
-    def __init__(self):
-        self._first_move = True
-        self._second_move = True
-        self._third_move = True
-        self._fourth_move = True
+class Computer():
+    def __init__(self, time_budget = 0.4, depth = 42,
+                 memory_budget = 4 * 1024 * 1024, workers = 1,
+                 book_path = default_path, engine = 'alphabeta',
+                 playouts = 20000, seed = None, rng = None, notify = None):
+        self._time_budget = time_budget # seconds available for each move
+        self._depth = depth # the maximum number of moves to look ahead
+        # seed of the random number generator, drawn at random if neither a
+        # seed nor a generator is passed. The seed is archived with the match,
+        # so it must fit the archive.
+        if seed is None and rng is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        if seed is not None and not 0 <= seed < no_seed:
+            raise ValueError('seed out of range: ' + str(seed))
+        self.seed = seed
+        self.random = rng if rng is not None else random.Random(seed)
+        if engine == 'mcts':
+            self._engine = Mcts(playouts, rng = self.random)
+        elif engine != 'alphabeta':
+            raise ValueError('unknown engine: ' + engine)
+        elif workers > 1:
+            self._engine = Parallel_engine(workers, memory_budget)
+        else:
+            self._engine = Engine(Transposition_table(memory_budget))
+        self._engine.cancel = threading.Event()
+        self._book = None # the opening book, if its file exists
+        if book_path is not None and os.path.exists(book_path):
+            self._book = Opening_book(book_path)
+        self._thread = None # background thread running the current search
+        self._move = None # move chosen by the last background search
+        self._found = threading.Event() # set when the background search ends
+        self._notify = notify # called when the background search ends
+        self._pondering = False # set while the thread is pondering
+        self._replies = {} # replies found while pondering and the stats of
+                           # their search, keyed by the bitboards of the state
+                           # they answer
+        self.stats = {'nodes': 0, 'seconds': 0, 'nps': 0, 'depth': 0,
+                      'score': 0, 'table': self._table_stats(),
+                      'book': False, 'pondered': False}
+
+
+    '''
+    Choose the best move for the given player in the given state. A move is
+    numbered like in the method moves of Position: a column to drop a piece
+    into, or a column to pop a piece from plus the number of columns.
+
+    Arguments:
+        position (Position): the current state of the match
+        player (int): the player to move, 0 for red, 1 for yellow
+
+    Returns:
+        move (int or None): the chosen move. None if there is no legal move.
+    '''
+    def choose_move(self, position, player):
+        # a state found in the opening book is not searched
+        if self._book is not None:
+            move = self._book.lookup(position, player)
+            if move is not None and move in position.moves(player):
+                self.stats = {'nodes': 0, 'seconds': 0, 'nps': 0, 'depth': 0,
+                              'score': None, 'table': self._table_stats(),
+                              'book': True, 'pondered': False}
+                return move
+
+        move, score = self._engine.best_move(position, player, self._depth,
+                                             self._time_budget)
+        self.stats = {'nodes': self._engine.nodes,
+                      'seconds': self._engine.elapsed,
+                      'nps': self._engine.nodes_per_second(),
+                      'depth': self._engine.depth,
+                      'score': score,
+                      'table': self._table_stats(),
+                      'book': False, 'pondered': False}
+        return move
+
+
+    '''
+    Return the counters of the transposition table of the search.
+
+    Arguments:
+        None
+
+    Returns:
+        stats (dict or None): the counters of the transposition table. None if
+                              the search has no table of its own.
+    '''
+    def _table_stats(self):
+        if self._engine.table is None:
+            return None
+        return self._engine.table.stats()
+
 
+    '''
+    Drop or pop a yellow piece as found best by the search. The first
+    call starts the search on a background thread, and the following calls
+    check if it has finished without waiting for it.
 
+    Arguments:
+        board (Board): an instance of class Board
+        pieces (list): all existing instances of Piece
+
+    Returns:
+        True if the computer has finished its turn. Otherwise, False.
+    '''
     def drop_piece(self, board, pieces):
-        ypos = 0
-        xpos_list = []
-        for piece in pieces:
-            xpos_list.append(piece.x)
-
-        redxpos_list = []
-        for piece in pieces:
-            if piece.colour == red:
-                redxpos_list.append(piece.x)
-
-        yellowxpos_list = []
-        for piece in pieces:
-            if piece.colour == yellow:
-                yellowxpos_list.append(piece.x) 
-                
-        sortedredxpos_list = sorted(redxpos_list)
-        
-        sortedxpos_list = sorted(xpos_list)
-        
-        sortedyellowxpos_list = sorted(yellowxpos_list)
-        
-        ypos_list = []
-        for piece in pieces:
-            ypos_list.append(piece.y)        
-        
-        redypos_list = []
-        for piece in pieces:
-            if piece.colour == red:
-                redypos_list.append(piece.y)
-        
-        yellowypos_list = []
-        for piece in pieces:
-            if piece.colour == yellow:
-                yellowypos_list.append(piece.y)
-                
-        sortedredypos_list = sorted(redypos_list)
-        
-        sortedypos_list = sorted(ypos_list)
-        
-        sortedyellowypos_list = sorted(yellowypos_list)
-                
-        while True:          
-            if self._first_move == True: #first move 
-                self._first_movexpos = int((2 + 0.5) * board.unit_size)
-                pieces.append(Piece((self._first_movexpos,ypos), board.c_radius, yellow))
-                self._first_move = False
-                break
-            
-            elif self._second_move == True: #second move
-                self._second_movexpos = int((random.randint(4,6) + 0.5) * board.unit_size)
-                pieces.append(Piece((self._second_movexpos,ypos), board.c_radius, yellow))
-                self._second_move = False
-                break
-            
-            #if there is a 3 stack block it
-            elif [item for item, count in collections.Counter(sortedxpos_list).items() if count == 3]:
-                dupxpos_list = [item for item, count in collections.Counter(sortedxpos_list).items() if count == 3]
-                vertical_blockxpos = dupxpos_list[0]
-                if not any((piece.y <= 1.5 * board.unit_size and piece.x == vertical_blockxpos) for piece in pieces):
-                    pieces.append(Piece((vertical_blockxpos,ypos), board.c_radius, yellow))
-                    break  
-                
-            #if you have a 3 stack attack it
-            elif [item for item, count in collections.Counter(sortedxpos_list).items() if count == 3]:
-                dupxpos_list = [item for item, count in collections.Counter(sortedyellowxpos_list).items() if count == 3]
-                vertical_attackxpos = dupxpos_list[0]
-                if not any((piece.y <= 1.5 * board.unit_size and piece.x == vertical_attackxpos) for piece in pieces):
-                    pieces.append(Piece((vertical_attackxpos,ypos), board.c_radius, yellow))
-                    break             
-                
-            #Initial moves to not get wrecked if needed   
-            elif self._third_move == True:
-                self._third_movexpos =int((random.randint(0,3) + 0.5) * board.unit_size)
-                pieces.append(Piece((self._third_movexpos,ypos), board.c_radius, yellow))
-                self._third_move = False    
+        if self._thread is None or self._pondering:
+            self.cancel()
+
+            # play at once a reply found while pondering
+            key = tuple(board.position.masks)
+            if key in self._replies:
+                self._move, self.stats = self._replies[key]
+                self.stats['pondered'] = True
+                self._replies = {}
+                self._play(board, pieces)
+                return True
+
+            self._replies = {}
+            self._engine.cancel.clear()
+            self._found.clear()
+            self._thread = threading.Thread(target = self._think,
+                               args = (board.position.copy(),
+                                       colours.index(yellow)),
+                               daemon = True)
+            self._thread.start()
+            return False
+        elif not self._found.is_set():
+            return False
+
+        self._thread.join()
+        self._thread = None
+        self._play(board, pieces)
+        return True
+
+
+    '''
+    Determine if the computer is searching its move on the background thread,
+    the move not being found yet.
+
+    Arguments:
+        None
+
+    Returns:
+        True if the search of its move is running. Otherwise, False.
+    '''
+    def is_thinking(self):
+        return self._thread is not None and not self._pondering and \
+               not self._found.is_set()
+
+
+    '''
+    Play the move chosen by the last search. Without any legal move, the turn
+    is passed, and recorded by the board like a turn lost to the timer so the
+    recorded moves keep alternating between red and yellow.
+
+    Arguments:
+        board (Board): an instance of class Board
+        pieces (list): all existing instances of Piece
+
+    Returns:
+        None
+    '''
+    def _play(self, board, pieces):
+        column = board.position.column
+        if self._move is None:
+            board.record_timeout()
+            return
+        elif self._move < column:
+            board.add_piece(pieces, self._move, yellow, 0)
+        else:
+            board.pop_piece(pieces, self._move - column)
+
+
+    '''
+    Start pondering on a background thread during the player's turn, unless it
+    has already started.
+
+    Arguments:
+        board (Board): an instance of class Board
+
+    Returns:
+        None
+    '''
+    def ponder(self, board):
+        if self._thread is None:
+            self._engine.cancel.clear()
+            self._pondering = True
+            self._thread = threading.Thread(target = self._ponder,
+                               args = (board.position.copy(),
+                                       colours.index(yellow)),
+                               daemon = True)
+            self._thread.start()
+
+
+    '''
+    Search the replies to the likely moves of the opponent, starting with the
+    move the opponent is predicted to play, then the drops and the pops, each
+    of them in the center columns first. Each reply is searched with the usual
+    time budget, and only replies found by a search that has not been
+    cancelled are kept. This method is the target of
+    the background thread while pondering.
+
+    Arguments:
+        position (Position): a copy of the current state of the match
+        player (int): the player pondering, 0 for red, 1 for yellow
+
+    Returns:
+        None
+    '''
+    def _ponder(self, position, player):
+        # nothing to ponder if the last move has ended the match
+        if position.winner() in ('red', 'yellow'):
+            return
+
+        cancel = self._engine.cancel
+        opponent = 1 - player
+        predicted, score = self._engine.best_move(position, opponent,
+                                                  self._depth,
+                                                  self._time_budget)
+        moves = sorted(position.moves(opponent),
+                       key = lambda m: (m != predicted, m >= position.column,
+                                        abs(2 * (m % position.column) -
+                                            position.column + 1)))
+        for move in moves:
+            if cancel.is_set():
                 break
-            
-            #Initial moves to not get wrecked if needed
-            elif self._fourth_move == True:
-                self._fourth_move = int((random.randint(4,6) + 0.5) * board.unit_size)
-                pieces.append(Piece((self._fourth_move,ypos), board.c_radius, yellow))
-                self._second_move = False
-                break                      
-            
-            else: 
-                xpos = int((random.randint(0,6)+0.5)*board.unit_size)
-                if not any((piece.y <= 1.5 * board.unit_size and piece.x == xpos) for piece in pieces):
-                    pieces.append(Piece((xpos,ypos), board.c_radius, yellow))
-                    break
\ No newline at end of file
+
+            after = position.copy()
+            after.play(move, opponent)
+            if after.winner() in ('red', 'yellow'):
+                continue
+            reply = self.choose_move(after, player)
+            if not cancel.is_set():
+                self._replies[tuple(after.masks)] = (reply, self.stats)
+
+
+    '''
+    Run the search on a copy of the state of the match. This method is the
+    target of the background thread.
+
+    Arguments:
+        position (Position): a copy of the current state of the match
+        player (int): the player to move, 0 for red, 1 for yellow
+
+    Returns:
+        None
+    '''
+    def _think(self, position, player):
+        self._move = self.choose_move(position, player)
+        self._found.set()
+        if self._notify is not None:
+            self._notify()
+
+
+    '''
+    Interrupt the search or the pondering running on the background thread, if
+    any, and wait for the thread to end. The result of a search is discarded.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def cancel(self):
+        if self._thread is not None:
+            self._engine.cancel.set()
+            self._thread.join()
+            self._thread = None
+        self._pondering = False
+
+
+    '''
+    Cancel any search running on the background thread, stop the worker
+    processes of the search if any, and close the opening book. This method is
+    called when the match ends.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def close(self):
+        self.cancel()
+        if isinstance(self._engine, Parallel_engine):
+            self._engine.shutdown()
+        if self._book is not None:
+            self._book.close()
+            self._book = None
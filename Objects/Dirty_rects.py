@@ -0,0 +1,77 @@
+# This file contains all attributes and methods of the class Dirty_rects
+
+# Dirty_rects finds the regions of the window which have changed since the last
+# frame (the dirty rectangles), so a scene only draws these regions again and
+# only pushes them to the display, instead of the whole window every frame.
+#
+# Every moving object of the scene (a piece, the cursor arrow, the timer bar) is
+# tracked each frame under a key of its own, with the rectangle it covers and
+# anything else changing its look, such as its colour. When either of them has
+# changed since the last frame, the old and the new rectangle are both dirty.
+# An object which is no longer tracked leaves its last rectangle dirty. Nothing
+# is dirty in a frame where nothing has changed.
+
+import pygame
+
+class Dirty_rects():
+    def __init__(self, screen):
+        self._screen_rect = pygame.Rect(0, 0, screen.width, screen.height)
+        self._previous = {} # rectangle and look of each object last frame
+        self._current = {} # rectangle and look of each object this frame
+        self.rects = [self._screen_rect] # the whole window is drawn first
+
+
+    '''
+    Track an object in the current frame.
+
+    Arguments:
+        key (hashable): identifies the object from one frame to the next
+        rect (pygame.Rect): the region of the window covered by the object
+        look (hashable): anything else changing the look of the object
+
+    Returns:
+        None
+    '''
+    def track(self, key, rect, look = None):
+        self._current[key] = (rect, look)
+        if self._previous.get(key) != (rect, look):
+            self.rects.append(rect)
+            if key in self._previous:
+                self.rects.append(self._previous[key][0])
+
+
+    '''
+    Mark the whole window as dirty, such as after it was uncovered or restored.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def invalidate(self):
+        self.rects.append(self._screen_rect)
+
+
+    '''
+    End the current frame: the objects which were not tracked in it leave
+    their last rectangle dirty. The dirty rectangles are returned and cleared.
+
+    Arguments:
+        None
+
+    Returns:
+        rects (list): the dirty rectangles of the frame, clipped to the window
+    '''
+    def flush(self):
+        for key in self._previous:
+            if key not in self._current:
+                self.rects.append(self._previous[key][0])
+        self._previous = self._current
+        self._current = {}
+
+        rects = [rect.clip(self._screen_rect) for rect in self.rects]
+        self.rects = []
+        if self._screen_rect in rects:
+            return [self._screen_rect]
+        return [rect for rect in rects if rect.width and rect.height]
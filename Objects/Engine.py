@@ -0,0 +1,469 @@
+# This file contains all attributes and methods of the class Engine
+
+# Engine searches the logical state of a match (an instance of Position) for
+# the best move: a column to drop a piece into, or, under the pop-out rule, a
+# column to pop a piece of its own colour from. A move is numbered like in the
+# method moves of Position, from 0 to 2 * column - 1. It uses a negamax search
+# with alpha-beta pruning, trying the center columns first, and a static
+# evaluation of every sequence of 4 cells once the depth of the search is
+# exhausted.
+# The search works on plain integers copied out of the instance of Position,
+# so it never has to modify the instance itself or undo a move.
+#
+# The search deepens iteratively until its time budget runs out, so a move is
+# always ready in time. It can also be interrupted from another thread through
+# the attribute "cancel". Engine keeps count of the number of positions (nodes)
+# it has visited, to track its throughput.
+# When given an instance of Transposition_table, the results of the states it
+# has searched are stored in it and reused, and the best move stored for a
+# state is searched first.
+#
+# Pop-outs break the assumptions of the plain game: a pop can complete a
+# sequence of 4 for either colour (if both colours have one, the match is
+# 'tied' and goes on), a full board is not the end of the match, and a state
+# can repeat itself. A state repeating one on the current line of the search
+# is scored as a draw.
+
+import time
+
+from Objects.Transposition_table import exact, lower, upper
+
+# score of a won position, large enough to never be reached by the evaluation
+win_score = 1000000
+
+# evaluation of a sequence of 4 cells holding 1, 2 or 3 pieces of one colour
+# and no piece of the other colour
+window_scores = (0, 1, 8, 64)
+# and holding 4 pieces, which only happens in a 'tied' state
+window_scores += (512,)
+
+# scores beyond this bound are won or lost positions, whose distance to the
+# end of the match is stored in the transposition table relative to the state
+mate_bound = win_score - 1000
+
+class Engine():
+    def __init__(self, table = None, pop_out = True):
+        self.table = table # an instance of Transposition_table, or None
+        self.pop_out = pop_out # search the pop-out moves if set to True
+        self.nodes = 0 # number of nodes visited by the last search
+        self.depth = 0 # depth of the last completed search
+        self.elapsed = 0 # time taken by the last search in seconds
+        self.cancel = None # a threading.Event interrupting the search when set
+        self._deadline = None # time at which the search must stop
+        self._stopped = False # set when the deadline has passed or the search
+                              # has been cancelled
+        self._path = set() # keys of the states on the current line of search
+
+
+    '''
+    Search the given state for the best move, using iterative deepening: the
+    state is searched 1 move ahead, then 2 moves ahead, and so on until the
+    maximum depth is reached or the time budget runs out.
+    Each search is ordered by the best moves stored by the previous one, and
+    the move returned is always the best one of the last completed search.
+    The search also ends as soon as a won or lost state is found.
+
+    Arguments:
+        position (Position): the current state of the match
+        player (int): the player to move, 0 for red, 1 for yellow
+        depth (int): the maximum number of moves to look ahead
+        time_budget (float or None): the number of seconds the search may take.
+                                     If nothing is passed, the search is not
+                                     limited in time.
+        beta (int or None): a score known to be out of reach: the search stops
+                            as soon as a move scores at least beta, and its
+                            score is then only a lower bound. If nothing is
+                            passed, the exact score is searched.
+
+    Returns:
+        move (int or None): the best move found. None if there is no legal move.
+        score (int or None): the score of the move for the player to move.
+                             None if no search was completed in time.
+    '''
+    def best_move(self, position, player, depth, time_budget = None,
+                  beta = None):
+        start = time.perf_counter()
+        self.nodes = 0
+        self.depth = 0
+        self._stopped = False
+        self._deadline = None
+        if time_budget is not None:
+            self._deadline = start + time_budget
+        self._setup(position)
+
+        me = position.masks[player]
+        opp = position.masks[1 - player]
+
+        # without pop-outs, the match ends when the board is full
+        if not self.pop_out:
+            depth = min(depth, position.row * position.column -
+                               (me | opp).bit_count())
+
+        # if not even a single search completes, play the first legal move
+        # in the order of the search
+        best_move = None
+        best_score = None
+        for move in self._order:
+            if self._play(me, opp, move) is not None:
+                best_move = move
+                break
+
+        for _depth in range(1, depth + 1):
+            move, score = self._search_root(me, opp, _depth, beta)
+            if self._stopped or move is None:
+                break
+            best_move, best_score = move, score
+            self.depth = _depth
+            if abs(score) > mate_bound:
+                break
+
+        self.elapsed = time.perf_counter() - start
+        return best_move, best_score
+
+
+    '''
+    Search the root state to a fixed depth.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+        depth (int): the number of moves to look ahead
+        beta (int or None): the score at which the search stops. None for no
+                            bound.
+
+    Returns:
+        move (int or None): the best move found. None if there is no legal
+                            move or the search was interrupted.
+        score (int or None): the score of the move for the player to move, a
+                             lower bound if it is at least beta
+    '''
+    def _search_root(self, me, opp, depth, beta = None):
+        best_move = None
+        best_score = None
+        alpha = -win_score - 1
+        if beta is None:
+            beta = win_score + 1
+        key = self._key(me, opp)
+        self._path = {key}
+        for move in self._move_order(me, opp):
+            child = self._play(me, opp, move)
+            if child is None:
+                continue
+
+            child_me, child_opp = child
+            score = -self._negamax(child_opp, child_me, depth - 1,
+                                   -beta, -alpha, 1)
+            if self._stopped:
+                return None, None
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if self.table is not None and best_score is not None:
+            kind = lower if best_score >= beta else exact
+            self.table.store(key, depth, kind,
+                             self._to_table(best_score, 0), best_move)
+        return best_move, best_score
+
+
+    '''
+    Return the number of nodes visited per second by the last search.
+
+    Arguments:
+        None
+
+    Returns:
+        nps (float): nodes per second. 0 if no search has been run yet.
+    '''
+    def nodes_per_second(self):
+        if self.elapsed <= 0:
+            return 0
+        return self.nodes / self.elapsed
+
+
+    '''
+    Copy the geometry of the board of the given state into the attributes used
+    by the search.
+
+    Arguments:
+        position (Position): the current state of the match
+
+    Returns:
+        None
+    '''
+    def _setup(self, position):
+        self._col_bits = position.row + 1
+        self._windows = position.windows
+        self._bottoms = [position.cell(c, 0) for c in range(position.column)]
+        self._columns = [position.column_mask(c)
+                         for c in range(position.column)]
+        self._columns_count = position.column
+        self._order = sorted(range(position.column),
+                             key = lambda c: abs(2 * c - position.column + 1))
+        if self.pop_out:
+            self._order += [position.column + c for c in self._order]
+        self._full = sum(self._columns)
+        self._bottom = sum(self._bottoms)
+        self._shifts = (1, self._col_bits, self._col_bits - 1,
+                        self._col_bits + 1)
+
+
+    '''
+    Return the key identifying a state in the transposition table. Since the
+    pieces of each column are always stacked from the bottom, adding the bottom
+    row to the bitboard of all pieces marks the first empty cell of each column,
+    which makes the key unique.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+
+    Returns:
+        key (int): the key of the state, never 0
+    '''
+    def _key(self, me, opp):
+        return me + (me | opp) + self._bottom
+
+
+    '''
+    Return the moves in the order they should be searched: the best move
+    stored in the transposition table first, then the drops and the pops, each
+    of them in the center columns first.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+
+    Returns:
+        order (list): the moves, legal or not
+    '''
+    def _move_order(self, me, opp):
+        if self.table is not None:
+            entry = self.table.probe(self._key(me, opp))
+            if entry is not None and entry[3] >= 0:
+                return [entry[3]] + [c for c in self._order if c != entry[3]]
+        return self._order
+
+
+    '''
+    Convert a score between its value relative to the root of the search and
+    its value relative to the state at the given ply, which is how won and lost
+    scores are stored in the transposition table.
+
+    Arguments:
+        score (int): the score to convert
+        ply (int): the number of moves played since the root
+
+    Returns:
+        score (int): the converted score
+    '''
+    def _to_table(self, score, ply):
+        if score > mate_bound:
+            return score + ply
+        elif score < -mate_bound:
+            return score - ply
+        return score
+
+
+    '''
+    Convert a score stored in the transposition table for the state at the given
+    ply back to its value relative to the root of the search.
+
+    Arguments:
+        score (int): the stored score
+        ply (int): the number of moves played since the root
+
+    Returns:
+        score (int): the converted score
+    '''
+    def _from_table(self, score, ply):
+        if score > mate_bound:
+            return score - ply
+        elif score < -mate_bound:
+            return score + ply
+        return score
+
+
+    '''
+    Play a move on the bitboards of a state.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+        move (int): the move to play
+
+    Returns:
+        bitboards (tuple or None): the new bitboards of the player and of the
+                                   opponent. None if the move is not legal.
+    '''
+    def _play(self, me, opp, move):
+        if move < self._columns_count:
+            bit = ((me | opp) + self._bottoms[move]) & self._columns[move]
+            if not bit:
+                return None
+            return me | bit, opp
+
+        column = move - self._columns_count
+        if not me & self._bottoms[column]:
+            return None
+        mask = self._columns[column]
+        return (me & ~mask) | ((me & mask) >> 1 & mask), \
+               (opp & ~mask) | ((opp & mask) >> 1 & mask)
+
+
+    '''
+    Determine if the given bitboard contains a sequence of 4 connected pieces.
+
+    Arguments:
+        mask (int): bitboard of a single colour
+
+    Returns:
+        True if a sequence of 4 is present. Otherwise, False.
+    '''
+    def _connected_four(self, mask):
+        for shift in self._shifts:
+            pairs = mask & (mask >> shift)
+            if pairs & (pairs >> 2 * shift):
+                return True
+        return False
+
+
+    '''
+    Return the score of a state for the player to move, from the point of view
+    of the pieces alone: every sequence of 4 cells holding pieces of a single
+    colour counts for that colour, more so the more pieces it holds.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+
+    Returns:
+        score (int): positive if the state favours the player to move
+    '''
+    def evaluate(self, me, opp):
+        score = 0
+        for window in self._windows:
+            mine = me & window
+            theirs = opp & window
+            if mine and not theirs:
+                score += window_scores[mine.bit_count()]
+            elif theirs and not mine:
+                score -= window_scores[theirs.bit_count()]
+        return score
+
+
+    '''
+    Negamax search with alpha-beta pruning. The opponent has just moved, so the
+    state is first checked for a sequence of 4: the opponent's after a drop,
+    either colour's after a pop.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+        depth (int): the number of moves left to look ahead
+        alpha (int): lower bound of the score for the player to move
+        beta (int): upper bound of the score for the player to move
+        ply (int): the number of moves played since the root
+
+    Returns:
+        score (int): the score of the state for the player to move
+    '''
+    def _negamax(self, me, opp, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            if self._deadline is not None and \
+               time.perf_counter() > self._deadline or \
+               self.cancel is not None and self.cancel.is_set():
+                self._stopped = True
+        if self._stopped:
+            return 0
+
+        # a faster win is preferred to a slower one. When both colours have a
+        # sequence of 4, the match is 'tied' and goes on.
+        pop_out = self.pop_out
+        if self._connected_four(opp):
+            if not pop_out or not self._connected_four(me):
+                return -win_score + ply
+        elif pop_out and self._connected_four(me):
+            return win_score - ply
+        occupied = me | opp
+        if not pop_out and occupied == self._full:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, opp)
+
+        # a state repeating one on the current line of the search is a draw
+        key = me + occupied + self._bottom
+        path = self._path
+        if pop_out and key in path:
+            return 0
+
+        # reuse the result of an earlier search of the same state
+        table = self.table
+        order = self._order
+        if table is not None:
+            entry = table.probe(key)
+            if entry is not None:
+                stored_depth, kind, score, stored_move = entry
+                if stored_depth >= depth:
+                    score = self._from_table(score, ply)
+                    if kind == exact:
+                        return score
+                    elif kind == lower and score >= beta:
+                        return score
+                    elif kind == upper and score <= alpha:
+                        return score
+                if stored_move >= 0:
+                    order = [stored_move] + [m for m in order
+                                             if m != stored_move]
+
+        columns = self._columns_count
+        bottoms = self._bottoms
+        column_masks = self._columns
+        if pop_out:
+            path.add(key)
+        alpha_start = alpha
+        best_score = -win_score - 1
+        best_move = -1
+        for move in order:
+            if move < columns:
+                bit = (occupied + bottoms[move]) & column_masks[move]
+                if not bit:
+                    continue
+                child_me, child_opp = me | bit, opp
+            else:
+                bit = bottoms[move - columns]
+                if not me & bit:
+                    continue
+                mask = column_masks[move - columns]
+                child_me = (me & ~mask) | ((me & mask) >> 1 & mask)
+                child_opp = (opp & ~mask) | ((opp & mask) >> 1 & mask)
+
+            score = -self._negamax(child_opp, child_me, depth - 1,
+                                   -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if pop_out:
+            path.discard(key)
+
+        # a player without any legal move passes, which is scored as a draw
+        if best_move < 0:
+            return 0
+
+        # results of an interrupted search are not reliable
+        if table is not None and not self._stopped:
+            if best_score <= alpha_start:
+                kind = upper
+            elif best_score >= beta:
+                kind = lower
+            else:
+                kind = exact
+            table.store(key, depth, kind, self._to_table(best_score, ply),
+                        best_move)
+        return best_score
@@ -0,0 +1,230 @@
+# This file contains all attributes and methods of the class Game_archive
+
+# Game_archive keeps the record of every match played, interactive or
+# simulated, in an append-only file. A match is stored as a short header
+# followed by its moves packed 2 per byte: each move takes 4 bits, holding a
+# drop (the column), a pop (the column plus the number of columns) or a turn
+# lost to the timer (twice the number of columns). On a board of 8 columns or
+# more, these codes do not fit in 4 bits, so each move takes a whole byte.
+#
+# Next to the archive, an index file holds the offset of each match in the
+# archive as a 8-byte integer, so the match with a given id (its number in the
+# archive, starting from 0) is found without reading the matches before it.
+# Both files are mapped in memory with mmap to read a match, so only the pages
+# holding it are ever loaded.
+#
+#     header: rows, columns, kind, winner (1 byte each) + number of moves
+#             (2 bytes) + seed (8 bytes)
+#     moves: 4 bits per move, the first move of each byte in its low bits, or
+#            1 byte per move on a board of 8 columns or more
+
+import mmap
+import os
+import struct
+
+header = struct.Struct('<BBBBHQ')
+offset = struct.Struct('<Q')
+
+# kinds of match, as stored in the header
+kinds = ('pvp', 'pve', 'simulation')
+
+# winners of a match, as stored in the header
+winners = (None, 'red', 'yellow')
+
+# stored seed of a match played without a seed
+no_seed = 2 ** 64 - 1
+
+# location of the archive used by the match scene by default
+default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, 'Data', 'games.bin')
+
+'''
+Return the number of bytes taken by the packed moves of a match.
+
+Arguments:
+    count (int): the number of moves
+    column (int): the number of columns
+
+Returns:
+    size (int): the number of bytes
+'''
+def packed_size(count, column):
+    if 2 * column > 15:
+        return count
+    return (count + 1) // 2
+
+
+'''
+Pack a list of moves, 2 moves per byte, or 1 move per byte on a board of 8
+columns or more.
+
+Arguments:
+    moves (list): the moves, numbered like in the method moves of Position, or
+                  None for a turn lost to the timer
+    column (int): the number of columns
+
+Returns:
+    packed (bytes): the packed moves
+'''
+def pack_moves(moves, column):
+    codes = [2 * column if move is None else move for move in moves]
+    if 2 * column > 15:
+        return bytes(codes)
+    if len(codes) % 2:
+        codes.append(0)
+    return bytes(codes[i] | codes[i + 1] << 4 for i in range(0, len(codes), 2))
+
+
+'''
+Unpack a list of moves packed by pack_moves.
+
+Arguments:
+    packed (bytes): the packed moves
+    count (int): the number of moves
+    column (int): the number of columns
+
+Returns:
+    moves (list): the moves, None for a turn lost to the timer
+'''
+def unpack_moves(packed, count, column):
+    if 2 * column > 15:
+        moves = list(packed)
+        return [None if code == 2 * column else code for code in moves[:count]]
+
+    moves = []
+    for byte in packed:
+        moves.append(byte & 15)
+        moves.append(byte >> 4)
+    return [None if code == 2 * column else code for code in moves[:count]]
+
+
+class Game_archive():
+    def __init__(self, path = default_path):
+        self.path = path # location of the archive
+        self._index_path = path + '.idx' # location of the index
+        self._archive = open(path, 'ab+')
+        self._index = open(self._index_path, 'ab+')
+        self._archive_map = None # the mapped archive, remapped when it grows
+        self._index_map = None # the mapped index, remapped when it grows
+
+
+    '''
+    Return the number of matches in the archive.
+
+    Arguments:
+        None
+
+    Returns:
+        count (int): the number of matches
+    '''
+    def __len__(self):
+        return os.path.getsize(self._index_path) // offset.size
+
+
+    '''
+    Append a match to the archive. A ValueError is raised if the match has
+    more than 65535 moves, the board more than 127 columns, or the seed is
+    negative or 2**64 - 1 or more, which the archive cannot hold.
+
+    Arguments:
+        moves (list): the moves of the match, numbered like in the method
+                      moves of Position, or None for a turn lost to the timer
+        winner (str or None): 'red', 'yellow', or None if the match has no
+                              winner
+        kind (str): 'pvp', 'pve' or 'simulation'
+        seed (int or None): the seed the match was played with, if any
+        row (int): the number of rows of the board
+        column (int): the number of columns of the board
+
+    Returns:
+        game (int): the id of the match
+    '''
+    def append(self, moves, winner, kind = 'simulation', seed = None,
+               row = 6, column = 7):
+        if len(moves) > 65535:
+            raise ValueError('too many moves to archive: ' + str(len(moves)))
+        if 2 * column > 255:
+            raise ValueError('too many columns to archive: ' + str(column))
+        if seed is not None and not 0 <= seed < no_seed:
+            raise ValueError('seed out of range to archive: ' + str(seed))
+        self._archive.seek(0, os.SEEK_END)
+        start = self._archive.tell()
+        self._archive.write(header.pack(row, column, kinds.index(kind),
+                                        winners.index(winner), len(moves),
+                                        no_seed if seed is None else seed))
+        self._archive.write(pack_moves(moves, column))
+        self._archive.flush()
+
+        # the index is written last, so a match is only listed once complete
+        self._index.write(offset.pack(start))
+        self._index.flush()
+        return len(self) - 1
+
+
+    '''
+    Read a match from the archive through the mapped files.
+
+    Arguments:
+        game (int): the id of the match
+
+    Returns:
+        record (dict): the moves, winner, kind, seed, rows and columns of the
+                       match, as passed to the method append
+    '''
+    def game(self, game):
+        if not 0 <= game < len(self):
+            raise IndexError('no match ' + str(game) + ' in ' + self.path)
+
+        if self._index_map is None or \
+           len(self._index_map) < (game + 1) * offset.size:
+            self._index_map = self._remap(self._index, self._index_map)
+        start, = offset.unpack_from(self._index_map, game * offset.size)
+
+        if self._archive_map is None or \
+           len(self._archive_map) < start + header.size:
+            self._archive_map = self._remap(self._archive, self._archive_map)
+        row, column, kind, winner, count, seed = \
+            header.unpack_from(self._archive_map, start)
+        moves_start = start + header.size
+        moves_end = moves_start + packed_size(count, column)
+        if len(self._archive_map) < moves_end:
+            self._archive_map = self._remap(self._archive, self._archive_map)
+        packed = self._archive_map[moves_start:moves_end]
+
+        return {'moves': unpack_moves(packed, count, column),
+                'winner': winners[winner], 'kind': kinds[kind],
+                'seed': None if seed == no_seed else seed,
+                'row': row, 'column': column}
+
+
+    '''
+    Map a file in memory again, to see the data appended since it was mapped.
+
+    Arguments:
+        data_file (file): the open file
+        old_map (mmap or None): the current map of the file, closed if any
+
+    Returns:
+        new_map (mmap): the new map of the file
+    '''
+    def _remap(self, data_file, old_map):
+        if old_map is not None:
+            old_map.close()
+        return mmap.mmap(data_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+
+    '''
+    Unmap and close the archive and its index.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def close(self):
+        for data_map in (self._archive_map, self._index_map):
+            if data_map is not None:
+                data_map.close()
+        self._archive.close()
+        self._index.close()
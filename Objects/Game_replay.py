@@ -0,0 +1,71 @@
+# This file contains all attributes and methods of the class Game_replay
+
+# Game_replay rebuilds the state of a recorded match after any number of moves
+# (plies), for the replay scene. Going through the moves from the start of the
+# match for every seek would get slower as the match gets longer, which is
+# common with pop-out moves, so the state is stored as a keyframe every few
+# plies when the replay is created. A state is then rebuilt from the nearest
+# keyframe before it by playing the few remaining moves on the logical board,
+# never through the falling animation of the instances of Piece.
+
+from Objects.Position import Position
+
+class Game_replay():
+    def __init__(self, record, interval = 16):
+        self.moves = record['moves'] # moves of the match, None for a turn
+                                     # lost to the timer
+        self.winner = record['winner'] # winner of the match, if any
+        self.row = record['row'] # the number of rows
+        self.column = record['column'] # the number of columns
+        self._interval = interval # the number of plies between keyframes
+        self._keyframes = [] # bitboards and column heights of every state
+                             # stored as a keyframe
+
+        position = Position(self.row, self.column)
+        for ply, move in enumerate(self.moves):
+            if ply % interval == 0:
+                self._keyframes.append((list(position.masks),
+                                        list(position.heights)))
+            if move is not None:
+                position.play(move, self.player_of(ply))
+
+
+    '''
+    Return the player making the move of the given ply, which alternates even
+    when a turn is lost to the timer.
+
+    Arguments:
+        ply (int): the index of the move in the match
+
+    Returns:
+        player (int): 0 for red, 1 for yellow
+    '''
+    def player_of(self, ply):
+        return ply % 2
+
+
+    '''
+    Rebuild the state of the match once the given number of moves is played.
+
+    Arguments:
+        ply (int): the number of moves played, from 0 to the number of moves
+                   of the match
+
+    Returns:
+        position (Position): the state of the match after these moves
+    '''
+    def position_at(self, ply):
+        ply = max(0, min(ply, len(self.moves)))
+        position = Position(self.row, self.column)
+        start = 0
+        if self._keyframes:
+            index = min(ply // self._interval, len(self._keyframes) - 1)
+            masks, heights = self._keyframes[index]
+            position.masks = list(masks)
+            position.heights = list(heights)
+            start = index * self._interval
+
+        for i in range(start, ply):
+            if self.moves[i] is not None:
+                position.play(self.moves[i], self.player_of(i))
+        return position
@@ -7,7 +7,7 @@
 
 import pygame
 
-from Objects.Piece import Piece
+from Objects.Position import colours
 
 # global identifiers each representing a RGB colour
 red = (255, 0, 0)
@@ -18,7 +18,7 @@ class Input_cursor():
         self._x = int(screen.width / 2) # x position
         self._colour = red # colour of the pieces to be dropped/deleted
         self._mode = 'add' # 'add' or 'delete'
-        self._timer_max = 800 # a total 800 frames available for each move 
+        self._timer_max = 800 # a total 800 ticks available for each move
         self._timer = self._timer_max # current state of timer
         self.player_turn = True # used in pve game only
 
@@ -53,20 +53,84 @@ class Input_cursor():
     
 
     '''
-    Decrement its timer by 1. When the timer reaches zero, it switches its
-    colour and reset the timer for pvp game, or it ends the player's turn and
-    reset the timer for pve game.
+    Return the regions of the window covered by its arrow and its timer bar,
+    and what else changes their look, so the match scene only draws them again
+    when they change.
+
+    Arguments:
+        screen (Screen): an instance of pygame class Screen
+        board (Board): an instance of pygame class Board
+
+    Returns:
+        arrow (pygame.Rect): the smallest rectangle around the arrow
+        timer (pygame.Rect): the rectangle of the timer bar
+        look (tuple): its colour and mode
+    '''
+    def rects(self, screen, board):
+        # 2 pixels of margin around the arrow, which pygame.draw.polygon may
+        # draw just beyond its vertices
+        arrow = pygame.Rect(self._x - board.unit_size / 4 - 2,
+                            0.5 * board.unit_size - 2,
+                            board.unit_size / 2 + 5, 0.5 * board.unit_size + 5)
+        timer = pygame.Rect(0, 0,
+                            int(self._timer / self._timer_max * screen.width),
+                            20)
+        return arrow, timer, (self._colour, self._mode)
+
+
+    '''
+    Return the number of ticks before its timer bar is next drawn shorter, or
+    its timer runs out, so the match scene can sleep until then when nothing
+    else is moving.
+
+    Arguments:
+        screen (Screen): an instance of pygame class Screen
+
+    Returns:
+        ticks (int): the number of ticks before its look changes
+    '''
+    def ticks_to_change(self, screen):
+        width = int(self._timer / self._timer_max * screen.width)
+        ticks = 1
+        while ticks < self._timer and \
+              int((self._timer - ticks) / self._timer_max * screen.width) \
+              == width:
+            ticks += 1
+        return ticks
+
+
+    '''
+    Return the time available to the player for each move, the match scene
+    running 50 ticks per second.
+    
+    Arguments:
+        None
+    
+    Returns:
+        seconds (float): the time available for each move in seconds
+    '''
+    def time_limit(self):
+        return self._timer_max * 0.02
+
+
+    '''
+    Decrement its timer by 1, once per tick. When the timer reaches zero, it
+    switches its colour and reset the timer for pvp game, or it ends the
+    player's turn and reset the timer for pve game. The lost turn is recorded
+    by the board.
     
     Arguments:
         game_state (str): 'pve' or 'pvp', 
                           representing single or multi player game
+        board (Board): an instance of class Board
     
     Returns:
         None
     '''
-    def update_timer(self, game_state):
+    def update_timer(self, game_state, board):
         self._timer -= 1        
         if self._timer <= 0:
+            board.record_timeout()
             if game_state == 'pvp':
                 self._change_turn()
             elif game_state == 'pve':
@@ -106,6 +170,22 @@ class Input_cursor():
                 return 'menu'
             
 
+    '''
+    Handle the user inputs while the player has to wait for the computer in a
+    pve game. Only the escape key is handled.
+    
+    Arguments:
+        None
+    
+    Returns:
+        None or 'menu'
+    '''
+    def handle_escape(self):
+        event = pygame.event.poll()
+        if event.type == pygame.KEYDOWN and event.key == 27: # ESC key
+            return 'menu'
+
+
     '''
     Move its x position by one board unit to the left/right when the user
     presses the left/right arrow key.
@@ -141,11 +221,11 @@ class Input_cursor():
     '''
     def _add_piece(self, board, pieces, game_state):
         # The add piece procedure is executed only if the selected column is
-        # not full.
-        if not any((piece.y <= 1.5 * board.unit_size and piece.x == self._x or \
-                    not piece.is_stationary) for piece in pieces):
+        # not full and no other instance of Piece is still falling.
+        column = board.column_of(self._x)
+        if board.position.can_drop(column) and board.is_settled():
 
-            pieces.append(Piece((self._x, -50), board.c_radius, self._colour))
+            board.add_piece(pieces, column, self._colour, -50)
             if game_state == 'pvp':
                 self._change_turn()
             elif game_state == 'pve':
@@ -173,21 +253,18 @@ class Input_cursor():
     '''
     def _delete_piece(self, screen, board, pieces, game_state):
         # The delete piece procedure is executed when all existing instances
-        # of Piece are stationary.
-        if all(piece.is_stationary for piece in pieces):
-            
-            # check each instances of Piece and remove only the correct one
-            for piece in pieces:
-                if piece.x == self._x and \
-                   screen.height - piece.y < board.unit_size / 2 + 5 and \
-                   self._colour == piece.colour:
-    
-                    pieces.remove(piece)
-
-                    if game_state == 'pvp':
-                        self._change_turn()
-                    elif game_state == 'pve':
-                        self.player_turn = False                    
+        # of Piece are stationary, and the piece at the bottom of the selected
+        # column is of the same colour as the cursor.
+        column = board.column_of(self._x)
+        if board.is_settled() and \
+           board.position.can_pop(column, colours.index(self._colour)):
+
+            board.pop_piece(pieces, column)
+
+            if game_state == 'pvp':
+                self._change_turn()
+            elif game_state == 'pve':
+                self.player_turn = False
 
 
     '''
@@ -0,0 +1,357 @@
+# This file contains all attributes and methods of the class Mcts
+
+# Mcts searches the logical state of a match with a Monte Carlo tree search,
+# as an alternative to the alpha-beta search of the class Engine. Instead of a
+# static evaluation, each state added to the tree is scored by playing random
+# matches (playouts) from it to the end. The tree is grown one state at a time,
+# following the children with the best upper confidence bound (UCT).
+#
+# The playouts are played on plain bitboard integers, in batches: the matches
+# of a batch are advanced together, one move each per step, and their results
+# are added to the tree at once. The tree is kept from one search to the next,
+# so the part of it below the moves played in the meantime is reused.
+#
+# Moves are numbered like in the method moves of Position. Mcts offers the same
+# methods and statistics as an instance of Engine, so an instance of Computer
+# can use either of them; its nodes are playouts.
+
+import math
+import random
+import time
+
+# score of a move the search is certain to win, as for the class Engine
+win_score = 1000000
+
+class _Node():
+    __slots__ = ('me', 'opp', 'untried', 'children', 'visits', 'wins',
+                 'result')
+
+    def __init__(self, me, opp, untried, result):
+        self.me = me # bitboard of the player to move
+        self.opp = opp # bitboard of the player who has just moved
+        self.untried = untried # legal moves not yet added to the tree
+        self.children = {} # child nodes, keyed by move
+        self.visits = 0 # number of playouts through the node
+        self.wins = 0 # playouts won by the player who has just moved, with
+                      # draws counted as half a win
+        self.result = result # 1 if the player who has just moved has won,
+                             # 0 if they have lost, None if the match goes on
+
+
+class Mcts():
+    def __init__(self, playouts = 2000, batch = 8, exploration = 1.4,
+                 pop_out = True, max_moves = 100, rng = None):
+        self.playouts = playouts # the number of playouts of each search
+        self.batch = batch # the number of playouts advanced together
+        self.exploration = exploration # weight of the exploration term of UCT
+        self.pop_out = pop_out # play the pop-out moves if set to True
+        self.max_moves = max_moves # moves after which a playout is a draw
+        self.table = None # no transposition table is used
+        self.cancel = None # a threading.Event interrupting the search when set
+        self.nodes = 0 # number of playouts of the last search
+        self.depth = 0 # depth of the deepest node of the tree
+        self.elapsed = 0 # time taken by the last search in seconds
+        # generator of the random moves, an instance of random.Random. A new
+        # one is created if nothing is passed.
+        self._random = rng if rng is not None else random.Random()
+        self._root = None # root of the tree kept from the last search
+        self._geometry = None # size of the board of the tree
+
+
+    '''
+    Search the given state for the best move, until the playout budget or the
+    time budget runs out. The move played the most often from the root is
+    returned.
+
+    Arguments:
+        position (Position): the current state of the match
+        player (int): the player to move, 0 for red, 1 for yellow
+        depth (int or None): not used, kept for compatibility with Engine
+        time_budget (float or None): the number of seconds the search may take.
+                                     If nothing is passed, the search is not
+                                     limited in time.
+
+    Returns:
+        move (int or None): the best move found. None if there is no legal move.
+        score (int or None): the ratio of playouts won through the move, scaled
+                             from -1000 (all lost) to 1000 (all won), or the
+                             score of the class Engine for a won or lost move.
+                             None if no playout was played.
+    '''
+    def best_move(self, position, player, depth = None, time_budget = None):
+        start = time.perf_counter()
+        deadline = None
+        if time_budget is not None:
+            deadline = start + time_budget
+        self._setup(position)
+        self.nodes = 0
+        self.depth = 0
+
+        root = self._reuse(position.masks[player], position.masks[1 - player])
+        if not root.untried and not root.children:
+            self.elapsed = time.perf_counter() - start
+            return None, None
+
+        while self.nodes < self.playouts:
+            if deadline is not None and time.perf_counter() > deadline or \
+               self.cancel is not None and self.cancel.is_set():
+                break
+            self._iterate(root)
+
+        # no playout has reached a child, when the search is interrupted or
+        # given no budget at all: any legal move is returned, without a score
+        if not root.children:
+            self.elapsed = time.perf_counter() - start
+            return root.untried[0], None
+
+        move, child = max(root.children.items(),
+                          key = lambda item: item[1].visits)
+        if child.result is not None:
+            score = win_score - 1 if child.result == 1 else -win_score + 1
+        else:
+            score = int(1000 * (2 * child.wins / child.visits - 1))
+        self.elapsed = time.perf_counter() - start
+        return move, score
+
+
+    '''
+    Return the number of playouts per second of the last search.
+
+    Arguments:
+        None
+
+    Returns:
+        pps (float): playouts per second. 0 if no search has been run yet.
+    '''
+    def playouts_per_second(self):
+        if self.elapsed <= 0:
+            return 0
+        return self.nodes / self.elapsed
+
+    # the nodes of Mcts are its playouts
+    nodes_per_second = playouts_per_second
+
+
+    '''
+    Copy the geometry of the board of the given state into the attributes used
+    by the search. The tree is dropped if the size of the board has changed.
+
+    Arguments:
+        position (Position): the current state of the match
+
+    Returns:
+        None
+    '''
+    def _setup(self, position):
+        if self._geometry != (position.row, position.column):
+            self._geometry = (position.row, position.column)
+            self._root = None
+        self._columns_count = position.column
+        self._col_bits = position.row + 1
+        self._bottoms = [position.cell(c, 0) for c in range(position.column)]
+        self._columns = [position.column_mask(c)
+                         for c in range(position.column)]
+        self._shifts = (1, self._col_bits, self._col_bits - 1,
+                        self._col_bits + 1)
+
+
+    '''
+    Return the root of the tree for the given state: the node of the state in
+    the tree kept from the last search, up to 2 moves below its root, or a new
+    node if the state is not in the tree.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+
+    Returns:
+        root (_Node): the node of the state
+    '''
+    def _reuse(self, me, opp):
+        nodes = [self._root] if self._root is not None else []
+        for level in range(3):
+            for node in nodes:
+                if node.me == me and node.opp == opp:
+                    self._root = node
+                    return node
+            nodes = [child for node in nodes
+                     for child in node.children.values()]
+
+        self._root = _Node(me, opp, self._moves(me, opp), None)
+        return self._root
+
+
+    '''
+    Run a single iteration of the search: select a path down the tree with
+    UCT, add a new child at its end, score it with a batch of playouts, and
+    add the results to every node of the path.
+
+    Arguments:
+        root (_Node): the root of the tree
+
+    Returns:
+        None
+    '''
+    def _iterate(self, root):
+        node = root
+        path = [root]
+        exploration = self.exploration
+        while not node.untried and node.children and node.result is None:
+            log_visits = math.log(node.visits)
+            node = max(node.children.values(),
+                       key = lambda child: child.wins / child.visits +
+                           exploration * math.sqrt(log_visits / child.visits))
+            path.append(node)
+
+        if node.result is None and node.untried:
+            move = node.untried.pop(self._random.randrange(len(node.untried)))
+            me, opp = self._play(node.me, node.opp, move)
+            result = self._result(me, opp)
+            child = _Node(opp, me, [] if result is not None else
+                                   self._moves(opp, me), result)
+            node.children[move] = child
+            node = child
+            path.append(node)
+            self.depth = max(self.depth, len(path) - 1)
+
+        # score the node: the result of a finished match counts for a whole
+        # batch, otherwise a batch of playouts is played
+        if node.result is not None:
+            wins = node.result * self.batch
+        elif not node.untried and not node.children:
+            wins = 0.5 * self.batch # no legal move, scored as a draw
+        else:
+            wins = self._playouts(node.me, node.opp, self.batch)
+        self.nodes += self.batch
+
+        # the wins of a node count for the player who has just moved into it,
+        # which alternates along the path
+        for _node in reversed(path):
+            _node.visits += self.batch
+            _node.wins += wins
+            wins = self.batch - wins
+
+
+    '''
+    Return the legal moves of the player to move.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+
+    Returns:
+        moves (list): the legal moves
+    '''
+    def _moves(self, me, opp):
+        occupied = me | opp
+        moves = [c for c in range(self._columns_count)
+                 if (occupied + self._bottoms[c]) & self._columns[c]]
+        if self.pop_out:
+            moves += [self._columns_count + c
+                      for c in range(self._columns_count)
+                      if me & self._bottoms[c]]
+        return moves
+
+
+    '''
+    Play a legal move on the bitboards of a state.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+        move (int): the move to play
+
+    Returns:
+        me (int): the new bitboard of the player
+        opp (int): the new bitboard of the opponent
+    '''
+    def _play(self, me, opp, move):
+        if move < self._columns_count:
+            bit = ((me | opp) + self._bottoms[move]) & self._columns[move]
+            return me | bit, opp
+
+        mask = self._columns[move - self._columns_count]
+        return (me & ~mask) | ((me & mask) >> 1 & mask), \
+               (opp & ~mask) | ((opp & mask) >> 1 & mask)
+
+
+    '''
+    Determine if the given bitboard contains a sequence of 4 connected pieces.
+
+    Arguments:
+        mask (int): bitboard of a single colour
+
+    Returns:
+        True if a sequence of 4 is present. Otherwise, False.
+    '''
+    def _connected_four(self, mask):
+        for shift in self._shifts:
+            pairs = mask & (mask >> shift)
+            if pairs & (pairs >> 2 * shift):
+                return True
+        return False
+
+
+    '''
+    Determine the result of a state for the player who has just moved, with
+    the 'tied' rule of the class Board: a state where both colours have a
+    sequence of 4 goes on.
+
+    Arguments:
+        mover (int): bitboard of the player who has just moved
+        other (int): bitboard of the other player
+
+    Returns:
+        result (int or None): 1 if the player who has just moved has won, 0 if
+                              they have lost, None if the match goes on
+    '''
+    def _result(self, mover, other):
+        mover_four = self._connected_four(mover)
+        other_four = self._connected_four(other)
+        if mover_four and not other_four:
+            return 1
+        elif other_four and not mover_four:
+            return 0
+        return None
+
+
+    '''
+    Play a batch of random matches from a state, advancing all of them by one
+    move at each step until every one of them has ended.
+
+    Arguments:
+        me (int): bitboard of the player to move
+        opp (int): bitboard of the opponent
+        count (int): the number of playouts
+
+    Returns:
+        wins (float): the number of playouts won by the opponent (the player
+                      who has just moved), with draws counted as half a win
+    '''
+    def _playouts(self, me, opp, count):
+        choice = self._random.choice
+        games = [(me, opp, 0)] * count # bitboards of the player to move, of
+                                       # the other player, and 1 if the
+                                       # player to move is the one who has
+                                       # just moved into the state
+        wins = 0
+        for step in range(self.max_moves):
+            if not games:
+                break
+            advanced = []
+            for me, opp, side in games:
+                moves = self._moves(me, opp)
+                if not moves:
+                    wins += 0.5
+                    continue
+                me, opp = self._play(me, opp, choice(moves))
+                result = self._result(me, opp)
+                if result is None:
+                    advanced.append((opp, me, 1 - side))
+                elif result == side:
+                    wins += 1 # the player who has just moved into the state
+                              # has won
+            games = advanced
+
+        # playouts still going after the maximum number of moves are draws
+        return wins + 0.5 * len(games)
@@ -0,0 +1,143 @@
+# This file contains all attributes and methods of the class Opening_book
+
+# Opening_book holds the best move of the states of the first moves of a match,
+# searched in advance by the tool "Tools/Build_book.py". The book is a binary
+# file made of a header followed by one record per state, sorted by the key of
+# the state, so a state is looked up with a binary search. The file is mapped
+# in memory with mmap instead of being read, so only the pages touched by the
+# lookups are ever loaded.
+#
+# A state and its mirror image share a single record, stored under the smaller
+# of their 2 keys. The move of a state looked up through its mirror image is
+# mirrored back.
+#
+# Each record holds the key (8 bytes) and the move (1 byte) of a state:
+#
+#     header: b'C4BOOK' + rows (1 byte) + columns (1 byte)
+#     record: key (unsigned, little-endian) + move
+
+import mmap
+import os
+import struct
+
+header = struct.Struct('<6sBB')
+record = struct.Struct('<QB')
+magic = b'C4BOOK'
+
+# location of the book used by the class Computer by default
+default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, 'Data', 'opening_book.bin')
+
+'''
+Return the key under which a state is stored in the book, and whether it is
+the key of its mirror image.
+
+Arguments:
+    position (Position): the state to look up
+    player (int): the player to move, 0 for red, 1 for yellow
+
+Returns:
+    key (int): the smaller of the keys of the state and of its mirror image
+    mirrored (bool): set to True if the key is the one of the mirror image
+'''
+def book_key(position, player):
+    key = position.key(player)
+    mirrored_key = position.mirror().key(player)
+    if mirrored_key < key:
+        return mirrored_key, True
+    return key, False
+
+
+'''
+Mirror a move from left to right, like the method mirror of Position.
+
+Arguments:
+    move (int): the move, numbered like in the method moves of Position
+    column (int): the number of columns
+
+Returns:
+    move (int): the mirrored move
+'''
+def mirror_move(move, column):
+    if move < column:
+        return column - 1 - move
+    return 3 * column - 1 - move
+
+
+'''
+Write a book file from the best move of each state.
+
+Arguments:
+    path (str): location of the book file
+    entries (dict): the best move of each state, keyed by the key returned by
+                    book_key
+    row (int): the number of rows of the board
+    column (int): the number of columns of the board
+
+Returns:
+    None
+'''
+def write_book(path, entries, row, column):
+    with open(path, 'wb') as book_file:
+        book_file.write(header.pack(magic, row, column))
+        for key in sorted(entries):
+            book_file.write(record.pack(key, entries[key]))
+
+
+class Opening_book():
+    def __init__(self, path = default_path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        name, self.row, self.column = header.unpack_from(self._map, 0)
+        if name != magic:
+            self.close()
+            raise ValueError('not an opening book: ' + path)
+        self.size = (len(self._map) - header.size) // record.size # records
+
+
+    '''
+    Look up the best move of a state with a binary search over the records.
+
+    Arguments:
+        position (Position): the state to look up
+        player (int): the player to move, 0 for red, 1 for yellow
+
+    Returns:
+        move (int or None): the best move of the state, numbered like in the
+                            method moves of Position. None if the state is not
+                            in the book.
+    '''
+    def lookup(self, position, player):
+        if position.row != self.row or position.column != self.column:
+            return None
+
+        key, mirrored = book_key(position, player)
+        low = 0
+        high = self.size
+        while low < high:
+            middle = (low + high) // 2
+            stored_key, move = record.unpack_from(self._map, header.size +
+                                                  middle * record.size)
+            if stored_key < key:
+                low = middle + 1
+            elif stored_key > key:
+                high = middle
+            elif mirrored:
+                return mirror_move(move, self.column)
+            else:
+                return move
+        return None
+
+
+    '''
+    Unmap and close the book file.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def close(self):
+        self._map.close()
+        self._file.close()
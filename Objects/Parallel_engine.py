@@ -0,0 +1,317 @@
+# This file contains all attributes and methods of the class Parallel_engine
+
+# Parallel_engine searches the logical state of a match like an instance of
+# Engine, but spreads the work over several processes: each move at the root
+# of the search is searched by its own worker process (root splitting), which
+# keeps an instance of Engine and a transposition table of its own from one
+# search to the next. The best move is picked once the workers have answered.
+#
+# The workers share an event with the main process, which interrupts their
+# searches at once when the search is cancelled, so a new search does not wait
+# for the workers of a cancelled one.
+#
+# Each move is searched to the same depth as the others, so the best score
+# found so far serves as a bound: the first move (the most likely to be the
+# best) is searched alone, then the other moves are searched in parallel
+# against its score, shared by the workers, and each of them is only searched
+# far enough to prove it is not better (the best score serves as the alpha
+# bound of the move). Without the bound, the workers visited about 3 times the
+# nodes of a single core. With it, about 1.25 times, but the first move is not
+# split, so the speedup stays small: about 1.2x at depth 9 on the workload of
+# Tools/Benchmark.py with 4 or more cores.
+#
+# A search limited in time deepens in rounds, like an instance of Engine: every
+# move is searched 1 move ahead, then every move 2 moves ahead, and so on until
+# the deadline. The move returned is the best one of the last round in which
+# every move was searched, never one picked from only some of the moves.
+#
+# It offers the same methods and statistics as an instance of Engine, so an
+# instance of Computer can use either of them.
+
+import concurrent.futures
+import multiprocessing
+import os
+import time
+
+from Objects.Engine import Engine, mate_bound, win_score
+from Objects.Position import Position
+from Objects.Transposition_table import Transposition_table
+
+# the instance of Engine of the current worker process
+_worker_engine = None
+
+# the best score found so far by the current search, shared by the worker
+# processes. Set to no_score while no move has been searched.
+_worker_bound = None
+no_score = -win_score - 1
+
+'''
+Create the instance of Engine of a worker process. This function is run once
+in each worker process when the pool starts.
+
+Arguments:
+    memory_budget (int): size of the transposition table of the worker in bytes
+    pop_out (bool): search the pop-out moves if set to True
+    stop (multiprocessing.Event): interrupts the search of the worker when set
+    bound (multiprocessing.Value): the best score found so far by the search
+
+Returns:
+    None
+'''
+def _init_worker(memory_budget, pop_out, stop, bound):
+    global _worker_engine, _worker_bound
+    _worker_engine = Engine(Transposition_table(memory_budget), pop_out)
+    _worker_engine.cancel = stop
+    _worker_bound = bound
+
+
+'''
+Search the state reached after the player plays the given move. This function
+is run in a worker process.
+
+Arguments:
+    masks (list): bitboards of the red and yellow pieces of the root state
+    heights (list): the number of pieces in each column of the root state
+    row (int): the number of rows
+    move (int): the move of the player, numbered like in the method moves of
+                Position
+    player (int): the player to move at the root, 0 for red, 1 for yellow
+    depth (int): the maximum number of moves to look ahead from the root
+    deadline (float or None): the wall-clock time (as given by time.time) at
+                              which the search must stop, shared by all
+                              worker processes. If nothing is passed, the
+                              search is not limited in time.
+
+Returns:
+    move (int): the move searched
+    score (int or None): the score of the move for the player to move at the
+                         root. None if the search was stopped before reaching
+                         the given depth.
+    depth (int): the depth reached from the root
+    nodes (int): the number of nodes visited
+    exact (bool): False if the score is only an upper bound, the move being
+                  worse than the best score found so far
+'''
+def _search_move(masks, heights, row, move, player, depth, deadline):
+    if _worker_engine.cancel.is_set():
+        return move, None, 0, 0, False
+    time_budget = None
+    if deadline is not None:
+        time_budget = deadline - time.time()
+        if time_budget <= 0:
+            return move, None, 0, 0, False
+    beta = None
+    if _worker_bound.value > no_score:
+        # the move only matters if it scores at least the best score, so the
+        # reply of the opponent only matters if it scores below its opposite
+        beta = -_worker_bound.value + 1
+
+    position = Position(row, len(heights))
+    position.masks = list(masks)
+    position.heights = list(heights)
+    position.play(move, player)
+    if not position.moves(1 - player, _worker_engine.pop_out):
+        return move, 0, depth, 0, True
+
+    # the state after the move is searched at least 1 move ahead
+    reply, score = _worker_engine.best_move(position, 1 - player,
+                                            max(depth - 1, 1), time_budget,
+                                            beta)
+    # a search stopped by the deadline or the cancel event only returns the
+    # score of a smaller depth
+    if score is None or _worker_engine.cancel.is_set() or \
+       deadline is not None and time.time() >= deadline:
+        return move, None, 0, _worker_engine.nodes, False
+    return move, -score, _worker_engine.depth + 1, _worker_engine.nodes, \
+           beta is None or score < beta
+
+
+class Parallel_engine():
+    def __init__(self, workers = None, memory_budget = 4 * 1024 * 1024,
+                 pop_out = True):
+        self.workers = workers or os.cpu_count() or 1 # number of processes
+        self.pop_out = pop_out # search the pop-out moves if set to True
+        self.table = None # each worker process has its own table
+        self.cancel = None # a threading.Event interrupting the search when set
+        self.nodes = 0 # number of nodes visited by the last search
+        self.depth = 0 # smallest depth reached by the last search
+        self.elapsed = 0 # time taken by the last search in seconds
+        context = multiprocessing.get_context()
+        self._stop = context.Event() # interrupts the searches of the workers
+        self._bound = context.Value('i', no_score) # best score found so far
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+                         self.workers, mp_context = context,
+                         initializer = _init_worker,
+                         initargs = (memory_budget, pop_out, self._stop,
+                                     self._bound))
+
+
+    '''
+    Search the given state for the best move. Each move is searched by a worker
+    process. With a time budget, every move is searched 1 move ahead, then 2
+    moves ahead, and so on until the deadline, and the best move of the last
+    round which searched every move is returned. A move which wins at once is
+    returned without searching.
+
+    Arguments:
+        position (Position): the current state of the match
+        player (int): the player to move, 0 for red, 1 for yellow
+        depth (int): the maximum number of moves to look ahead
+        time_budget (float or None): the number of seconds the search may take.
+                                     If nothing is passed, the search is not
+                                     limited in time.
+
+    Returns:
+        move (int or None): the best move found. None if there is no legal move.
+        score (int or None): the score of the move for the player to move.
+                             None if no search was completed in time.
+    '''
+    def best_move(self, position, player, depth, time_budget = None):
+        start = time.perf_counter()
+        self.nodes = 0
+        self.depth = 0
+
+        moves = sorted(position.moves(player, self.pop_out),
+                       key = lambda m: (m >= position.column,
+                                        abs(2 * (m % position.column) -
+                                            position.column + 1)))
+        if not moves:
+            self.elapsed = time.perf_counter() - start
+            return None, None
+
+        # a move completing a sequence of 4 for the player only wins at once
+        for move in moves:
+            after = position.copy()
+            after.play(move, player)
+            if after.winner() == ('red', 'yellow')[player]:
+                self.depth = 1
+                self.elapsed = time.perf_counter() - start
+                return move, win_score - 1
+
+        deadline = None
+        rounds = [depth]
+        if time_budget is not None:
+            deadline = time.time() + time_budget
+            rounds = range(1, depth + 1)
+
+        # if not even a single round completes, play the first move in the
+        # order of the search
+        best_move = moves[0]
+        best_score = None
+        for _depth in rounds:
+            result = self._search_round(position, player, moves, _depth,
+                                        deadline)
+            if result is None:
+                break
+            best_move, best_score, depths = result
+            self.depth = min(depths)
+            # no move could be searched deeper: each of them ended in a won,
+            # lost or full board state
+            if abs(best_score) > mate_bound or max(depths) < _depth:
+                break
+            # the next round searches the best move first
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+        self.elapsed = time.perf_counter() - start
+        return best_move, best_score
+
+
+    '''
+    Search every move of the given state to the given depth. The first move is
+    searched alone, then the other moves are searched in parallel against the
+    best score found so far.
+
+    Arguments:
+        position (Position): the current state of the match
+        player (int): the player to move, 0 for red, 1 for yellow
+        moves (list): the legal moves of the player, the first one searched
+                      alone
+        depth (int): the number of moves to look ahead
+        deadline (float or None): the wall-clock time (as given by time.time)
+                                  at which the search must stop. If nothing is
+                                  passed, the search is not limited in time.
+
+    Returns:
+        result (tuple or None): the best move, its score and the depth reached
+                                by each move. None if the search was stopped
+                                or cancelled before every move was searched.
+    '''
+    def _search_round(self, position, player, moves, depth, deadline):
+        self._bound.value = no_score
+        search = lambda move: self._pool.submit(_search_move, position.masks,
+                                                position.heights, position.row,
+                                                move, player, depth, deadline)
+
+        # the first move, the most likely to be the best, is searched alone,
+        # so the other moves are all searched against its score
+        pending = set([search(moves[0])])
+        later = moves[1:]
+
+        best_move = None
+        best_score = None
+        depths = []
+        complete = True
+        while pending:
+            done, pending = concurrent.futures.wait(pending, timeout = 0.01)
+            for future in done:
+                move, score, _depth, nodes, exact = future.result()
+                self.nodes += nodes
+                if score is None:
+                    complete = False
+                    continue
+                depths.append(_depth)
+                if not exact:
+                    continue
+                if best_score is None or score > best_score or \
+                   score == best_score and moves.index(move) < \
+                                           moves.index(best_move):
+                    best_move, best_score = move, score
+                    self._bound.value = best_score
+            if later and not pending:
+                if not complete:
+                    break
+                pending = set(search(move) for move in later)
+                later = []
+            if self.cancel is not None and self.cancel.is_set():
+                # stop the workers still searching, and wait for them so the
+                # next search starts with every worker free
+                self._stop.set()
+                for future in pending:
+                    future.cancel()
+                concurrent.futures.wait(pending)
+                self._stop.clear()
+                return None
+
+        if not complete:
+            return None
+        return best_move, best_score, depths
+
+
+    '''
+    Return the number of nodes visited per second by the last search, over all
+    worker processes.
+
+    Arguments:
+        None
+
+    Returns:
+        nps (float): nodes per second. 0 if no search has been run yet.
+    '''
+    def nodes_per_second(self):
+        if self.elapsed <= 0:
+            return 0
+        return self.nodes / self.elapsed
+
+
+    '''
+    Stop the worker processes.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def shutdown(self):
+        self._pool.shutdown(cancel_futures = True)
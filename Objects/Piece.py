@@ -1,10 +1,10 @@
 # This file contains all attributes and methods of the class Piece
 
 # Piece represents the red or yellow circular pieces each player places in the
-# game board. Piece acts like a rigid body which drops at a constant velocity
-# and detect any collision with the bottom of the board or other Piece below.
-# The collision detections is enabled only when an instance of Board is present,
-# such as in the match scene.
+# game board. Piece is only an animation: it drops at a constant velocity until
+# it reaches its landing y position, which is given by the instance of Board
+# from the height of the column when the piece is dropped. Pieces without a
+# landing y position, such as the ones in the menu scene, never stop falling.
 
 import pygame
 
@@ -13,85 +13,58 @@ red = (255, 0, 0)
 yellow = (255, 255, 0)
 
 class Piece():
-    def __init__(self, position, radius, colour):
+    def __init__(self, position, radius, colour, landing_y = None):
         self.x = position[0] # x position
         self.y = position[1] # y position
         self._radius = radius # radius of the piece
         self.colour = colour # colour of the piece
+        self.landing_y = landing_y # y position where it comes to rest
         self.is_stationary = False
 
 
     '''
-    Determine if it has collided with any other instances of pieces below. This
-    method is enabled only when an instance of the class Board is available in
-    the current state of the game.
+    Update its current state by a single tick of the clock of the scene, so it
+    falls at the same speed whatever the frame rate. If it has reached its
+    landing y position, then it is considered stationary. Otherwise, it is not
+    stationary and its y position is incremented by 25 pixels, without going
+    past the landing y position.
+
+    The returned value allows the instance of Board to referee the match only
+    when a piece comes to rest, instead of on every tick.
     
     Arguments:
-        other_piece (Piece): another instance of Piece
-        board (Board or None): an instance of class Board. If nothing is passed,
-                               it is set to None.
+        None
     
     Returns:
-        True if an instance of Board is available and an instance of Piece is
-        immediately below. Otherwise, False.
+        True if it has become stationary during this update. Otherwise, False.
     '''
-    def _collided(self, other_piece, board = None):
-        return board != None and \
-               other_piece.y > self.y and \
-               other_piece.y - self.y <= board.unit_size and \
-               other_piece.x == self.x
+    def update(self):
+        was_stationary = self.is_stationary
 
+        if self.landing_y is None:
+            self.y += 25
+            self.is_stationary = False
+        elif self.y < self.landing_y:
+            self.y = min(self.y + 25, self.landing_y)
+            self.is_stationary = False # not stationary if it's moving!
+        else:
+            self.is_stationary = True
 
-    '''
-    Determine if it has reached the bottom of the instance of Board. This
-    method is enabled only when an instance of the class Board is available in
-    the current state of the game.
-    
-    Arguments:
-        screen (Screen): an instance of pygame class Screen
-        board (Board or None): an instance of class Board. If nothing is passed,
-                               it is set to None.
-    
-    Returns:
-        True if it has reach the bottom row of the instance of Board.
-        Otherwise, False.
-    '''
-    def _is_at_bottom(self, screen, board = None):
-        return board != None and \
-               self.y >= screen.height - board.unit_size / 2
+        return self.is_stationary and not was_stationary
 
 
     '''
-    Update its current state. If it has reached the bottom row of the instance
-    of Board or has collided with another instance of Piece immediately below,
-    then it is considered stationary. Otherwise, it is not stationary and its
-    y position is incremented by 25 pixels.
-    
+    Return the region of the window it covers in its current state.
+
     Arguments:
-        screen (Screen): an instance of pygame class Screen
-        pieces (list or None): all existing instances of Piece. If nothing is
-                               passed, it is set to None.
-        board (Board or None): an instance of class Board. If nothing is passed,
-                               it is set to None.
-    
-    Returns:
         None
-    '''
-    def update(self, screen, pieces = None, board = None):
-        has_collided = False
-        self.is_stationary = True # stationary by default
-        
-        # increment y position only if it is not colliding with the bottom
-        # of the board or any other instance of Piece below.
-        if not self._is_at_bottom(screen, board):
-            if pieces != None:
-                for piece in pieces:
-                    if self._collided(piece, board):
-                        has_collided = True
 
-            if not has_collided:
-                self.y += 25
-                self.is_stationary = False # not stationary if it's moving!
+    Returns:
+        rect (pygame.Rect): the smallest rectangle around the piece
+    '''
+    def rect(self):
+        return pygame.Rect(self.x - self._radius, self.y - self._radius,
+                           2 * self._radius + 1, 2 * self._radius + 1)
 
 
     '''
@@ -0,0 +1,366 @@
+# This file contains all attributes and methods of the class Position
+
+# Position represents the logical state of a match, independent of anything
+# drawn on the screen. The board is stored as two bitboards, one per colour,
+# plus the height of every column. Each column occupies (rows + 1) bits of the
+# bitboards, from the bottom row upward, with the extra bit acting as a
+# sentinel which keeps sequences from wrapping over into the next column.
+#
+#      6 13 20 27 34 41 48   <- sentinel bits
+#    +---------------------+
+#    | 5 12 19 26 33 40 47 |
+#    | 4 11 18 25 32 39 46 |
+#    | 3 10 17 24 31 38 45 |
+#    | 2  9 16 23 30 37 44 |
+#    | 1  8 15 22 29 36 43 |
+#    | 0  7 14 21 28 35 42 |
+#    +---------------------+
+#
+# All rules of the match (move legality, full columns, pop-outs and sequences
+# of 4 connected pieces) are answered with a few integer operations.
+
+# global identifiers each representing a RGB colour
+red = (255, 0, 0)
+yellow = (255, 255, 0)
+
+# the colour of each player, indexed by the player number used in Position
+colours = (red, yellow)
+
+# all sequences of 4 cells on a board of a given size, computed once per size
+_windows_cache = {}
+
+'''
+Compute the bitboard of every sequence of 4 cells on a board, in either
+vertical, horizontal, negative diagonal, or positive diagonal orientation, as
+well as the sequences passing through each individual cell.
+
+Arguments:
+    row (int): the number of rows
+    column (int): the number of columns
+
+Returns:
+    windows (list): bitboards of all sequences of 4 cells
+    cell_windows (dict): the bitboards of the sequences passing through each
+                         cell, keyed by the bit index of the cell
+'''
+def four_windows(row, column):
+    if (row, column) not in _windows_cache:
+        windows = []
+        cell_windows = {}
+        for c in range(column):
+            for r in range(row):
+                for dc, dr in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    cells = [(c + i * dc, r + i * dr) for i in range(4)]
+                    if all(0 <= _c < column and 0 <= _r < row
+                           for _c, _r in cells):
+                        window = 0
+                        for _c, _r in cells:
+                            window |= 1 << (_c * (row + 1) + _r)
+                        windows.append(window)
+                        for _c, _r in cells:
+                            index = _c * (row + 1) + _r
+                            cell_windows.setdefault(index, []).append(window)
+        _windows_cache[(row, column)] = (windows, cell_windows)
+
+    return _windows_cache[(row, column)]
+
+
+class Position():
+    def __init__(self, row = 6, column = 7):
+        self.row = row # the number of rows
+        self.column = column # the number of columns
+        self.masks = [0, 0] # bitboards of the red and yellow pieces
+        self.heights = [0] * column # number of pieces in each column
+        self._col_bits = row + 1 # number of bits used by each column
+        self._bottom = 0 # mask of the bottom row
+        for c in range(column):
+            self._bottom |= 1 << (c * self._col_bits)
+        self._column_masks = [((1 << row) - 1) << (c * self._col_bits)
+                              for c in range(column)]
+        self.windows, self._cell_windows = four_windows(row, column)
+
+
+    '''
+    Create an independent copy of the current state.
+
+    Arguments:
+        None
+
+    Returns:
+        position (Position): a new instance of Position in the same state
+    '''
+    def copy(self):
+        position = Position.__new__(Position)
+        position.row = self.row
+        position.column = self.column
+        position.masks = list(self.masks)
+        position.heights = list(self.heights)
+        position._col_bits = self._col_bits
+        position._bottom = self._bottom
+        position._column_masks = self._column_masks
+        position.windows = self.windows
+        position._cell_windows = self._cell_windows
+        return position
+
+
+    '''
+    Create a copy of the current state mirrored from left to right, which is
+    equivalent to the current state by symmetry.
+
+    Arguments:
+        None
+
+    Returns:
+        position (Position): a new instance of Position, mirrored
+    '''
+    def mirror(self):
+        position = self.copy()
+        for player in (0, 1):
+            mask = 0
+            for c in range(self.column):
+                bits = (self.masks[player] & self._column_masks[c]) >> \
+                       (c * self._col_bits)
+                mask |= bits << ((self.column - 1 - c) * self._col_bits)
+            position.masks[player] = mask
+        position.heights = self.heights[::-1]
+        return position
+
+
+    '''
+    Return a key identifying the state for the given player to move. Since the
+    pieces of each column are always stacked from the bottom, adding the bottom
+    row to the bitboard of all pieces marks the first empty cell of each column,
+    which makes the key unique.
+
+    Arguments:
+        player (int): the player to move, 0 for red, 1 for yellow
+
+    Returns:
+        key (int): the key of the state, never 0
+    '''
+    def key(self, player):
+        return self.masks[player] + (self.masks[0] | self.masks[1]) + \
+               self._bottom
+
+
+    '''
+    Return the bit representing a single cell of the board.
+
+    Arguments:
+        column (int): column of the cell, counted from the left
+        row (int): row of the cell, counted from the bottom
+
+    Returns:
+        bit (int): an integer with only the bit of the cell set
+    '''
+    def cell(self, column, row):
+        return 1 << (column * self._col_bits + row)
+
+
+    '''
+    Return the player occupying a single cell of the board.
+
+    Arguments:
+        column (int): column of the cell, counted from the left
+        row (int): row of the cell, counted from the bottom
+
+    Returns:
+        player (int or None): 0 for red, 1 for yellow, None if the cell is empty
+    '''
+    def owner(self, column, row):
+        bit = self.cell(column, row)
+        if self.masks[0] & bit:
+            return 0
+        elif self.masks[1] & bit:
+            return 1
+        return None
+
+
+    '''
+    Determine if a piece can be dropped into the given column.
+
+    Arguments:
+        column (int): column to drop the piece into
+
+    Returns:
+        True if the column is not full. Otherwise, False.
+    '''
+    def can_drop(self, column):
+        return 0 <= column < self.column and self.heights[column] < self.row
+
+
+    '''
+    Drop a piece of the given player into the given column.
+
+    Arguments:
+        column (int): column to drop the piece into
+        player (int): 0 for red, 1 for yellow
+
+    Returns:
+        row (int): the row the piece has landed on, counted from the bottom
+    '''
+    def drop(self, column, player):
+        row = self.heights[column]
+        self.masks[player] |= self.cell(column, row)
+        self.heights[column] = row + 1
+        return row
+
+
+    '''
+    Determine if the given player can pop out the piece at the bottom of the
+    given column, which is only allowed when the piece is of their own colour.
+
+    Arguments:
+        column (int): column to pop the piece from
+        player (int): 0 for red, 1 for yellow
+
+    Returns:
+        True if the bottom piece of the column belongs to the player.
+        Otherwise, False.
+    '''
+    def can_pop(self, column, player):
+        return 0 <= column < self.column and \
+               self.masks[player] & self.cell(column, 0) != 0
+
+
+    '''
+    Remove the piece at the bottom of the given column, shifting every piece
+    above it down by a single row.
+
+    Arguments:
+        column (int): column to pop the piece from
+
+    Returns:
+        None
+    '''
+    def pop(self, column):
+        col_mask = self._column_masks[column]
+        for player in (0, 1):
+            mask = self.masks[player]
+            self.masks[player] = (mask & ~col_mask) | \
+                                 ((mask & col_mask) >> 1 & col_mask)
+        self.heights[column] -= 1
+
+
+    '''
+    Return every legal move of the given player. A move is either a column to
+    drop a piece into, from 0 to column - 1, or a column to pop a piece from
+    plus the number of columns, from column to 2 * column - 1.
+
+    Arguments:
+        player (int): 0 for red, 1 for yellow
+        pop_out (bool): include the pop-out moves if set to True. It is
+                        defaulted as True.
+
+    Returns:
+        moves (list): the legal moves of the player
+    '''
+    def moves(self, player, pop_out = True):
+        moves = [c for c in range(self.column) if self.can_drop(c)]
+        if pop_out:
+            moves += [self.column + c for c in range(self.column)
+                      if self.can_pop(c, player)]
+        return moves
+
+
+    '''
+    Play a move of the given player, as returned by the method moves.
+
+    Arguments:
+        move (int): the column to drop a piece into, or the column to pop a
+                    piece from plus the number of columns
+        player (int): 0 for red, 1 for yellow
+
+    Returns:
+        None
+    '''
+    def play(self, move, player):
+        if move < self.column:
+            self.drop(move, player)
+        else:
+            self.pop(move - self.column)
+
+
+    '''
+    Return the bitboard of the given column.
+
+    Arguments:
+        column (int): column of the board, counted from the left
+
+    Returns:
+        mask (int): an integer with the bits of every cell of the column set
+    '''
+    def column_mask(self, column):
+        return self._column_masks[column]
+
+
+    '''
+    Return every sequence of 4 cells passing through a single cell, which are
+    the only sequences that a piece landing on that cell can complete.
+
+    Arguments:
+        column (int): column of the cell, counted from the left
+        row (int): row of the cell, counted from the bottom
+
+    Returns:
+        windows (list): bitboards of the sequences through the cell
+    '''
+    def windows_through(self, column, row):
+        return self._cell_windows[column * self._col_bits + row]
+
+
+    '''
+    Determine if the given bitboard contains a sequence of 4 connected pieces
+    in either vertical, horizontal, negative diagonal, or positive diagonal
+    orientation.
+
+    Arguments:
+        mask (int): bitboard of a single colour
+
+    Returns:
+        True if a sequence of 4 is present. Otherwise, False.
+    '''
+    def connected_four(self, mask):
+        for shift in (1, self._col_bits, self._col_bits - 1,
+                      self._col_bits + 1):
+            pairs = mask & (mask >> shift)
+            if pairs & (pairs >> 2 * shift):
+                return True
+        return False
+
+
+    '''
+    Determine the winner of the current state. If both colours have achieved a
+    sequence of 4, the state is considered 'tied'.
+
+    Arguments:
+        None
+
+    Returns:
+        winner (str or None): 'red', 'yellow' or 'tied'. None if neither colour
+                              has achieved a sequence of 4.
+    '''
+    def winner(self):
+        red_four = self.connected_four(self.masks[0])
+        yellow_four = self.connected_four(self.masks[1])
+        if red_four and yellow_four:
+            return 'tied'
+        elif red_four:
+            return 'red'
+        elif yellow_four:
+            return 'yellow'
+        return None
+
+
+    '''
+    Determine if every column of the board is full.
+
+    Arguments:
+        None
+
+    Returns:
+        True if no piece can be dropped anymore. Otherwise, False.
+    '''
+    def is_full(self):
+        return (self.masks[0] | self.masks[1]) == \
+               self._bottom * ((1 << self.row) - 1)
@@ -0,0 +1,116 @@
+# This file contains the procedures which draw text on the screen for every
+# scene
+
+# Looking up a system font with pygame.font.SysFont is slow, and so is rendering
+# a line of text, while the scenes draw the same few lines of text on every
+# frame. The fonts are therefore kept in a cache keyed by their style, size,
+# boldness and italicness, and the rendered lines of text in a second cache
+# keyed by their text, font and colour. The second cache holds a limited number
+# of lines: once full, the line used the longest time ago is dropped (least
+# recently used). Both caches count their hits and misses.
+
+from collections import OrderedDict
+
+import pygame
+
+# the maximum number of rendered lines of text kept in the cache
+max_rendered = 256
+
+_fonts = {} # fonts, keyed by (style, size, bold, italic)
+_rendered = OrderedDict() # rendered lines of text, keyed by (text, style,
+                          # size, bold, italic, colour), least recently used
+                          # first
+_counters = {'font hits': 0, 'font misses': 0,
+             'text hits': 0, 'text misses': 0}
+
+'''
+Return a system font from the cache, looking it up on the first use.
+
+Arguments:
+    style (str): font style
+    size (int): font size
+    bold (bool): bold font if set to True
+    italic (bool): italic font if set to True
+
+Returns:
+    font (pygame.font.Font): the font
+'''
+def get_font(style, size, bold = False, italic = False):
+    key = (style, size, bold, italic)
+    if key in _fonts:
+        _counters['font hits'] += 1
+    else:
+        _counters['font misses'] += 1
+        _fonts[key] = pygame.font.SysFont(style, size, bold, italic)
+    return _fonts[key]
+
+
+'''
+Return a rendered line of text from the cache, rendering it on the first use.
+
+Arguments:
+    text (str): text to be rendered
+    style (str): font style
+    size (int): font size
+    color (tuple): font color as a rgb combination
+    bold (bool): bold the text if set to True. It is defaulted as False.
+    italic (bool): italasize the text if set to True. It is defaulted as False.
+
+Returns:
+    text_image (pygame.Surface): the rendered text
+'''
+def render_text(text, style, size, color, bold = False, italic = False):
+    key = (text, style, size, bold, italic, color)
+    if key in _rendered:
+        _counters['text hits'] += 1
+        _rendered.move_to_end(key)
+        return _rendered[key]
+
+    _counters['text misses'] += 1
+    text_image = get_font(style, size, bold, italic).render(text, False, color)
+    _rendered[key] = text_image
+    if len(_rendered) > max_rendered:
+        _rendered.popitem(last = False)
+    return text_image
+
+
+'''
+draw a single line of customized text on the pygame screen.
+
+Arguments:
+    screen (Screen): an instance of pygame class Screen
+    text (str): text to be displayed
+    style (str): font style
+    size (int): font size
+    color (tuple): font color as a rgb combination
+    position (tuple): location of the top left corner of the text relative to
+                      the top left corner of the window
+    bold (bool): bold the text if set to True. It is defaulted as False.
+    italic (bool): italasize the text if set to True. It is defaulted as False.
+
+Returns:
+    None
+'''
+def draw_text(screen, text, style, size, color, position,
+              bold = False, italic = False):
+    screen.surface.blit(render_text(text, style, size, color, bold, italic),
+                        position)
+
+
+'''
+Return the counters of the caches.
+
+Arguments:
+    None
+
+Returns:
+    stats (dict): the hits and misses of the font cache and of the rendered
+                  text cache, as well as the ratio of hits to lookups of each
+'''
+def text_stats():
+    stats = dict(_counters)
+    for cache in ('font', 'text'):
+        lookups = stats[cache + ' hits'] + stats[cache + ' misses']
+        stats[cache + ' hit rate'] = \
+            stats[cache + ' hits'] / lookups if lookups else 0
+    return stats
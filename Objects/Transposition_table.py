@@ -0,0 +1,181 @@
+# This file contains all attributes and methods of the class Transposition_table
+
+# Transposition_table remembers the results of an instance of Engine for the
+# states it has already searched, so a state reached again through a different
+# order of moves is not searched a second time. Each state is identified by a
+# key computed from its bitboards.
+#
+# The table never grows: its entries are stored in fixed size arrays allocated
+# once from a memory budget. The entries are grouped in buckets of 2 slots. The
+# first slot keeps the deepest search of the states sharing the bucket, while
+# the second slot is always replaced by the latest one. The number of hits,
+# misses and collisions (misses on a bucket holding other states) are counted
+# for profiling.
+#
+# The keys are stored as 64-bit integers. The key of a state on a board of more
+# than 64 bits, such as 7 rows and 9 columns, is folded to 64 bits first: two
+# such states may then share a key, at the small risk of reusing the result of
+# the wrong state.
+
+from array import array
+
+# kinds of score stored in an entry, depending on how the search ended
+exact = 0 # the score is the exact score of the state
+lower = 1 # the search failed high, the score is a lower bound
+upper = 2 # the search failed low, the score is an upper bound
+
+# the number of bytes used by a single entry: key, score, depth, kind and move
+entry_size = 8 + 4 + 1 + 1 + 1
+
+# odd multiplier spreading keys which only differ in their high bits across
+# all buckets (Fibonacci hashing)
+multiplier = 0x9E3779B97F4A7C15
+
+# the bits of a stored key
+key_mask = 0xFFFFFFFFFFFFFFFF
+
+'''
+Fold a key of more than 64 bits to 64 bits, mixing its high bits into its low
+bits. A key of 64 bits or less is returned as it is.
+
+Arguments:
+    key (int): the key of a state, never 0
+
+Returns:
+    key (int): the key to store, never 0
+'''
+def fold_key(key):
+    if key <= key_mask:
+        return key
+    return ((key & key_mask) ^ ((key >> 64) * multiplier & key_mask)) or 1
+
+class Transposition_table():
+    def __init__(self, memory_budget = 4 * 1024 * 1024):
+        # the number of buckets fitting in the memory budget
+        self._buckets = max(1, memory_budget // (2 * entry_size))
+        size = 2 * self._buckets
+        self._keys = array('Q', bytes(8 * size)) # 0 marks an empty slot
+        self._scores = array('i', bytes(4 * size))
+        self._depths = array('b', bytes(size))
+        self._kinds = array('b', bytes(size))
+        self._moves = array('b', bytes(size))
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+
+    '''
+    Return the number of bytes used by the entries of the table.
+
+    Arguments:
+        None
+
+    Returns:
+        memory (int): size of the arrays holding the entries in bytes
+    '''
+    def memory(self):
+        return 2 * self._buckets * entry_size
+
+
+    '''
+    Return the first slot of the bucket holding the given key.
+
+    Arguments:
+        key (int): the key of a state
+
+    Returns:
+        slot (int): index of the first slot of the bucket in the arrays
+    '''
+    def _slot(self, key):
+        return ((key * multiplier & key_mask) >> 16) % self._buckets * 2
+
+
+    '''
+    Look up the entry of a state.
+
+    Arguments:
+        key (int): the key of the state, never 0
+
+    Returns:
+        entry (tuple or None): the depth, kind, score and best move stored for
+                               the state. None if the state is not stored.
+    '''
+    def probe(self, key):
+        if key > key_mask:
+            key = fold_key(key)
+        slot = self._slot(key)
+        keys = self._keys
+        if keys[slot] != key:
+            slot += 1
+            if keys[slot] != key:
+                self.misses += 1
+                if keys[slot] or keys[slot - 1]:
+                    self.collisions += 1
+                return None
+
+        self.hits += 1
+        return (self._depths[slot], self._kinds[slot], self._scores[slot],
+                self._moves[slot])
+
+
+    '''
+    Store the result of a search. The entry goes in the first slot of its
+    bucket if it holds the same state or a shallower search, and in the second
+    slot otherwise.
+
+    Arguments:
+        key (int): the key of the state, never 0
+        depth (int): the number of moves the search looked ahead
+        kind (int): exact, lower or upper
+        score (int): the score of the state for the player to move
+        move (int): the best move found, -1 if there is none
+
+    Returns:
+        None
+    '''
+    def store(self, key, depth, kind, score, move):
+        if key > key_mask:
+            key = fold_key(key)
+        slot = self._slot(key)
+        if self._keys[slot] != key and self._depths[slot] > depth:
+            slot += 1
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._kinds[slot] = kind
+        self._scores[slot] = score
+        self._moves[slot] = move
+
+
+    '''
+    Remove every entry and reset the counters.
+
+    Arguments:
+        None
+
+    Returns:
+        None
+    '''
+    def clear(self):
+        size = 2 * self._buckets
+        self._keys = array('Q', bytes(8 * size))
+        self._depths = array('b', bytes(size))
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+
+    '''
+    Return the counters of the table.
+
+    Arguments:
+        None
+
+    Returns:
+        stats (dict): the number of hits, misses and collisions, as well as the
+                      ratio of hits to lookups
+    '''
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'collisions': self.collisions,
+                'hit rate': self.hits / lookups if lookups else 0}
@@ -3,7 +3,9 @@
 
 import pygame
 
+from Objects.Clock import wait_event
 from Objects.Piece import Piece
+from Objects.Text import draw_text
 
 # global identifiers each representing a RGB colour
 black = (0,0,0)
@@ -24,13 +26,12 @@ Returns:
 '''
 def run_game_over(screen, winner):
     # wait for 2 seconds before displaying the game over scenes to allow the
-    # player to observe the location of the sequence. While waiting, the event
-    # queue is cleared every 100 ms to ensure no input event such as the enter
-    # key is present which can Sterminate the game over scene immediately.
-    for i in range(20):
-        pygame.event.clear()
-        pygame.time.wait(100)  
-    
+    # player to observe the location of the sequence. The event queue is then
+    # cleared to ensure no input event such as the enter key is present which
+    # can terminate the game over scene immediately.
+    pygame.time.wait(2000)
+    pygame.event.clear()
+
     # refresh the scene
     pygame.draw.rect(screen.surface, black, (0, 0, screen.width, screen.height))
     
@@ -49,42 +50,16 @@ def run_game_over(screen, winner):
     
     pygame.display.update()
     
-    # since no background animation is present, the maximum fps is set to 10
-    # to decrease cpu usage while in this scene. When the player presses
-    # the enter key, the scene goes back to 'menu'.
+    # since no background animation is present, the scene sleeps until the
+    # next input, which keeps the cpu usage close to zero while in this scene.
+    # When the player presses the enter key, the scene goes back to 'menu'.
     while True:
         if return_to_menu(): return 'menu'
-        pygame.time.wait(100)
-    
-
-'''
-draw a single line of customized text on the pygame screen.
-
-Arguments:
-    screen (Screen): an instance of pygame class Screen
-    text (str): text to be displayed
-    style (str): font style
-    size (int): font size
-    color (tuple): font color as a rgb combination
-    position (tuple): location of the top left corner of the text relative to
-                      the top left corner of the window
-    bold (bool): bold the text if set to True. It is defaulted as False.
-    italic (bool): italasize the text if set to True. It is defaulted as False.
-
-Returns:
-    None
-'''
-def draw_text(screen, text, style, size, color, position,
-              bold = False, italic = False):
-
-    text_font = pygame.font.SysFont(style, size, bold, italic)
-    text_image = text_font.render(text, False, color)
-    screen.surface.blit(text_image, position)
 
 
 '''
 Tells the run_game_over function to exit itself and have the game return to the
-main menu, when the user hits the enter key.
+main menu, when the user hits the enter key. It waits for the next input.
 
 Arguments:
     None
@@ -95,7 +70,7 @@ Returns:
                          Otherwise, False.
 '''
 def return_to_menu():
-    event = pygame.event.poll()
+    event = wait_event()
     if event.type == pygame.KEYDOWN and event.key == 13: # enter key
         back_to_menu = True
     else:
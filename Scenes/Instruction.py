@@ -3,6 +3,9 @@
 
 import pygame
 
+from Objects.Clock import wait_event
+from Objects.Text import render_text
+
 # global identifiers each representing a RGB colour
 blue = (0,0,255)
 black = (0,0,0)
@@ -80,12 +83,11 @@ def run_instruction(screen):
 
     pygame.display.update()
 
-    # since no background animation is present, the maximum fps is set to 10
-    # to decrease cpu usage while in this scene. When the player presses
-    # the enter key, the scene goes back to 'menu'.    
+    # since no background animation is present, the scene sleeps until the
+    # next input, which keeps the cpu usage close to zero while in this scene.
+    # When the player presses the enter key, the scene goes back to 'menu'.
     while True:
-        if return_to_menu(): return 'menu'      
-        pygame.time.wait(100)
+        if return_to_menu(): return 'menu'
 
 
 '''
@@ -111,15 +113,14 @@ Returns:
 def draw_text(screen, text, style, size, color, x, y,
               bold = False, italic = False):
 
-    text_font = pygame.font.SysFont(style, size, bold, italic)
-    text_image = text_font.render(text, False, color)
-    screen.surface.blit(text_image, (x, y))
+    screen.surface.blit(render_text(text, style, size, color, bold, italic),
+                        (x, y))
     return y + size # y position of the next line of text
 
 
 '''
 Tells the run_Intruction function to exit itself and have the game return to the
-main menu, when the user hits the enter key.
+main menu, when the user hits the enter key. It waits for the next input.
 
 Arguments:
     None
@@ -130,7 +131,7 @@ Returns:
                          Otherwise, False.
 '''
 def return_to_menu():
-    event = pygame.event.poll()
+    event = wait_event()
     if event.type == pygame.KEYDOWN and event.key == 13: # enter key
         back_to_menu = True
     else:
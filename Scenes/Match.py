@@ -8,10 +8,23 @@ from Objects.Board import Board
 from Objects.Input_cursor import Input_cursor
 from Objects.Piece import Piece
 from Objects.Computer import Computer
+from Objects.Clock import Clock
+from Objects.Dirty_rects import Dirty_rects
+from Objects.Game_archive import Game_archive
 
 # global identifier representing the rgb of black
 black = (0,0,0)
 
+# type of the event posted when the computer has found its move
+move_found = pygame.USEREVENT
+
+# types of the events after which the whole window has to be drawn again, as
+# its content may have been lost: the window uncovered, restored or shown again
+redraw_events = tuple(getattr(pygame, name) for name in
+                      ('VIDEOEXPOSE', 'ACTIVEEVENT', 'WINDOWEXPOSED',
+                       'WINDOWRESTORED', 'WINDOWSHOWN')
+                      if hasattr(pygame, name))
+
 '''
 run all necessary operations associated with the match scene.
 
@@ -30,21 +43,40 @@ def run_match(game_state, screen):
     # of the match.
     board, cursor, pieces, computer = match_init(screen, game_state)
 
+    # only the regions of the window which change are drawn and displayed
+    dirty = Dirty_rects(screen)
+
+    # the state of the match is updated once per tick of the clock, whatever
+    # the frame rate
+    clock = Clock()
+
     # loop till a winner has been announced or the player wish to exit the game
     # promptly with the ESC key.
     while True:
-        # draw the match scene in the current state, then update the state
-        draw_match(screen, board, cursor, pieces)
-        winner = update_match(screen, board, cursor, pieces, computer, game_state)
-        
-        # switch to 'menu' scene if player used ESC key, or 
-        # switch to 'game over' scene if a winner is announced
-        # Otherwise, keep looping at a maximum fps of 50.
-        if winner == 'menu':
-            return 'menu', winner
-        elif winner == 'red' or winner == 'yellow':
-            return 'game over', winner
-        pygame.time.wait(20)
+        # draw the match scene in the current state, then update the state by
+        # the ticks passed since the last frame. Only the regions which have
+        # changed are drawn, unless the window has to be drawn again after it
+        # was uncovered or restored.
+        if pygame.event.peek(redraw_events):
+            dirty.invalidate()
+        draw_match(screen, board, cursor, pieces, dirty)
+        wait_match(screen, board, cursor, computer, game_state, clock)
+        for tick in range(clock.tick()):
+            winner = update_match(screen, board, cursor, pieces, computer,
+                                  game_state)
+
+            # switch to 'menu' scene if player used ESC key, or
+            # switch to 'game over' scene if a winner is announced
+            # The computer stops thinking in both cases, and the match is
+            # written to the archive of matches.
+            if winner == 'menu':
+                if computer: computer.close()
+                archive_match(board, game_state, None, computer)
+                return 'menu', winner
+            elif winner == 'red' or winner == 'yellow':
+                if computer: computer.close()
+                archive_match(board, game_state, winner, computer)
+                return 'game over', winner
 
 
 '''
@@ -74,17 +106,116 @@ def match_init(screen, game_state):
     # an array that holds all the instance of piece currently present
     pieces = []    
 
-    # instantiate a computer for pve game only
+    # instantiate a computer for pve game only, which is given 1/40 of the
+    # time available to the player for each of its moves
     computer = None
     if game_state == 'pve':
-        computer = Computer()
+        computer = Computer(cursor.time_limit() / 40,
+                            notify = lambda: pygame.event.post(
+                                pygame.event.Event(move_found)))
 
     return board, cursor, pieces, computer
 
 
+'''
+Sleep while nothing in the match is moving, until an input arrives or the next
+change of the scene: the next tick where the timer bar of the player is drawn
+shorter, or the move found by the computer. The match is paused while the
+window is minimized.
+
+Arguments:
+    screen (Screen): an instance of pygame class Screen
+    board (Board): an instance of class Board
+    cursor (Input_cursor): an instance of class Input_cursor
+    computer (Computer): an instance of class Computer for 'pve' game only.
+                         otherwise, None.
+    game_state (str): 'pvp' or 'pve'
+    clock (Clock): the clock of the match scene
+
+Returns:
+    None
+'''
+def wait_match(screen, board, cursor, computer, game_state, clock):
+    if not pygame.display.get_active():
+        clock.wait()
+    elif not board.is_settled():
+        return
+    elif game_state == 'pvp' or cursor.player_turn:
+        clock.wait(cursor.ticks_to_change(screen))
+    elif computer.is_thinking():
+        clock.wait()
+
+
+'''
+Append the moves of the match to the archive of matches, unless no move was
+played.
+
+Arguments:
+    board (Board): an instance of class Board
+    game_state (str): 'pvp' or 'pve'
+    winner (str or None): the winner of the match, either 'red' or 'yellow'.
+                          None if the player left the match.
+    computer (Computer): an instance of class Computer for 'pve' game only.
+                         otherwise, None.
+
+Returns:
+    None
+'''
+def archive_match(board, game_state, winner, computer):
+    if not board.moves:
+        return
+    archive = Game_archive()
+    archive.append(board.moves, winner, game_state,
+                   computer.seed if computer else None,
+                   board.position.row, board.position.column)
+    archive.close()
+
+
 '''
 Draw all objects, including the game board, the current state of input cursor,
-and the current state all existing instances of Piece onto the pygame screen.
+and the current state all existing instances of Piece onto the pygame screen,
+then push them to the display. When an instance of Dirty_rects is passed, only
+the regions of the window which have changed since the last frame are drawn
+and displayed, and nothing at all when nothing has changed.
+
+Arguments:
+    screen (Screen): an instance of pygame class Screen
+    board (Board): an instance of class Board
+    cursor (Input_cursor): an instance of class Input_cursor
+    pieces (list): all existing instances of Piece
+    dirty (Dirty_rects): tracks the changing regions of the window. If nothing
+                         is passed, the whole window is drawn and displayed.
+
+Returns:
+    None
+'''
+def draw_match(screen, board, cursor, pieces, dirty = None):
+    if dirty is None:
+        draw_objects(screen, board, cursor, pieces)
+        pygame.display.update()
+        return
+
+    # track every object which can move or change its look
+    for piece in pieces:
+        dirty.track(piece, piece.rect())
+    arrow, timer, look = cursor.rects(screen, board)
+    dirty.track('arrow', arrow, look)
+    dirty.track('timer', timer, look)
+
+    # draw the whole scene clipped to each dirty region
+    rects = dirty.flush()
+    for rect in rects:
+        screen.surface.set_clip(rect)
+        draw_objects(screen, board, cursor, pieces)
+    screen.surface.set_clip(None)
+
+    if rects:
+        pygame.display.update(rects)
+
+
+'''
+Draw all objects of the match onto the pygame screen, within its clipping
+region.
 
 Arguments:
     screen (Screen): an instance of pygame class Screen
@@ -95,17 +226,17 @@ Arguments:
 Returns:
     None
 '''
-def draw_match(screen, board, cursor, pieces):
+def draw_objects(screen, board, cursor, pieces):
     # refresh the scene
     pygame.draw.rect(screen.surface, black, (0, 0, screen.width, screen.height))
     
-    # draw the instance of Board
-    board.draw_rect(screen)
-    board.draw_holes(screen)
-    
     # draw any existing instance of Piece in their current state
     for piece in pieces:
         piece.draw(screen)
+
+    # draw the instance of Board over the pieces, which are seen through its
+    # holes
+    board.draw(screen)
     
     # draw the instance of Input_cursor
     cursor.draw(screen, board)
@@ -129,25 +260,29 @@ Returns:
 def update_match(screen, board, cursor, pieces, computer, game_state):
     # process the user input using the method of Input_cursor. For pve game,
     # the instance of Computer will instantiate a Piece after every player's
-    # turn has ended.
+    # turn has ended. The computer thinks on a background thread, so the match
+    # keeps being drawn and the ESC key still works while it is thinking. It
+    # also ponders its replies while the player is thinking.
     if game_state == 'pvp' or cursor.player_turn:
-        cursor.update_timer(game_state)
+        if game_state == 'pve':
+            computer.ponder(board)
+        cursor.update_timer(game_state, board)
         back_to_menu = cursor.handle_input(screen, board, pieces, game_state)
         if back_to_menu: return 'menu'
     elif game_state == 'pve':
-        if all(piece.is_stationary for piece in pieces):
-            computer.drop_piece(board, pieces)
+        if cursor.handle_escape(): return 'menu'
+        if board.is_settled() and computer.drop_piece(board, pieces):
             cursor.player_turn = True
 
-    # update the state of any existing instances of Piece
+    # update the state of any existing instances of Piece. The instance of
+    # Board also acts as a referee of the match, which checks for sequences
+    # of 4 through each instance of Piece as soon as it becomes stationary.
     for piece in pieces:
-        piece.update(screen, pieces, board)
-
-    # The instance of Board acts also act as a referee of the match which
-    # checks if a winner is present in the current state of the match.
-    # If no winner is present, it is assigned None.
-    winner = board.check_winner(pieces)
+        if piece.update():
+            board.piece_landed(piece)
 
-    pygame.display.update()
+    # The referee keeps its result between frames. If no winner is present,
+    # it is assigned None.
+    winner = board.check_winner()
 
     return winner
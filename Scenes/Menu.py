@@ -2,9 +2,15 @@
 # the variable "game_state" is set to 'menu'
 
 import pygame
-from random import randint, seed
+from random import Random
 
+from Objects.Clock import Clock
 from Objects.Piece import Piece
+from Objects.Text import draw_text
+
+# random number generator of the background animation, kept apart from the
+# generators of the instances of Computer
+animation_random = Random()
 
 # global identifiers each representing a RGB colour
 black = (0,0,0)
@@ -19,19 +25,21 @@ Arguments:
     screen (Screen): an instance of pygame class Screen
 
 Returns:
-    'pve', 'pvp', 'instruction', or 'exit'
+    'pve', 'pvp', 'instruction', 'replay', or 'exit'
 '''
 def run_menu(screen):
-    # shuffle the seed for random number generator
-    seed(randint(0, 10000))
-
     # initilize an empty array to hold any existing instances of Piece as the
     # loop runs below
     pieces = []
 
-    # the highlighted features are represented by a single integer from 0 to 3.
+    # the highlighted features are represented by a single integer from 0 to 4.
     highlighted = 0
 
+    # the background animation moves on once per tick of the clock. The
+    # maximum fps is set to 50 fps to allow for adequately smooth animations
+    # to be displayed
+    clock = Clock()
+
     # loop till a feature is selected
     while True:
         # refresh the scene
@@ -41,7 +49,10 @@ def run_menu(screen):
         # background animation - 
         # drop a red or yellow piece on a random frequency
         # delete any piece that falls below the viewing window
-        update_animation(screen, pieces)
+        for tick in range(clock.tick()):
+            update_animation(screen, pieces)
+        for piece in pieces:
+            piece.draw(screen)
 
         # draw interactive features
         highlighted, selected = feature_interaction(screen, highlighted)
@@ -55,18 +66,19 @@ def run_menu(screen):
             elif highlighted == 2:
                 return 'instruction'
             elif highlighted == 3:
+                return 'replay'
+            elif highlighted == 4:
                 return 'exit'
 
         pygame.display.update()
-        
-        # The maximum fps is set to 50 fps to allow for adequately smooth
-        # animations to be displayed
-        pygame.time.wait(20)
+
+        # the animation is paused while the window is minimized
+        if not pygame.display.get_active():
+            clock.wait()
 
 
 '''
-update the current state of the background animation, and draw the updated
-state onto the screen.
+update the current state of the background animation by a single tick.
 
 Arguments:
     screen (Screen): an instance of pygame class Screen
@@ -81,11 +93,9 @@ def update_animation(screen, pieces):
     drop_piece(screen, pieces)
     delete_piece(screen, pieces)
 
-    # draw any existing instance of Piece at their current state, then
-    # update its state
+    # update the state of any existing instance of Piece
     for piece in pieces:
-        piece.draw(screen)
-        piece.update(screen)
+        piece.update()
 
 
 '''
@@ -101,15 +111,16 @@ Returns:
 '''
 def drop_piece(screen, pieces):
     drop_chance = 10 # 0 to 100% chance to drop a piece
-    drop_roll = randint(1, 100)
+    drop_roll = animation_random.randint(1, 100)
     if drop_roll <= drop_chance:
         
-        x = randint(0, screen.width) # x position of dropped piece
+        # x position of dropped piece
+        x = animation_random.randint(0, screen.width)
         y = -50 # the piece is dropped above the view window
         r = 40 # radius of the dropped piece
         
         red_chance = 50 # 0 to 100% chance for the dropped piece to be red
-        red_roll = randint(1, 100)
+        red_roll = animation_random.randint(1, 100)
         
         if red_roll <= red_chance:
             pieces.append(Piece((x, y), r, red))
@@ -140,11 +151,11 @@ user has selected any feature.
 
 Arguments:
     screen (Screen): an instance of pygame class Screen
-    highlighted (int): an integer (1 to 4) representing the currently 
+    highlighted (int): an integer (0 to 4) representing the currently 
                        highlighted feature
 
 Returns:
-    highlighted (int): an integer (1 to 4) representing the next 
+    highlighted (int): an integer (0 to 4) representing the next 
                        highlighted feature
     selected (bool): set to True if the user has selected a feature
 '''
@@ -176,48 +187,27 @@ def feature_interaction(screen, highlighted):
     else:
         draw_text(screen, 'Instruction', font, 50, white, (255, 450))
     if highlighted == 3:
-        draw_text(screen, 'Exit', font, 50, red, (310, 500))
+        draw_text(screen, 'Replay', font, 50, red, (295, 500))
     else:
-        draw_text(screen, 'Exit', font, 50, white, (310, 500))
+        draw_text(screen, 'Replay', font, 50, white, (295, 500))
+    if highlighted == 4:
+        draw_text(screen, 'Exit', font, 50, yellow, (310, 550))
+    else:
+        draw_text(screen, 'Exit', font, 50, white, (310, 550))
 
     return highlighted, selected
 
 
-'''
-draw a single line of customized text on the pygame screen.
-
-Arguments:
-    screen (Screen): an instance of pygame class Screen
-    text (str): text to be displayed
-    style (str): font style
-    size (int): font size
-    color (tuple): font color as a rgb combination
-    position (tuple): location of the top left corner of the text relative to
-                      the top left corner of the window
-    bold (bool): bold the text if set to True. It is defaulted as False.
-    italic (bool): italasize the text if set to True. It is defaulted as False.
-
-Returns:
-    None
-'''
-def draw_text(screen, text, style, size, color, position,
-              bold = False, italic = False):
-
-    text_font = pygame.font.SysFont(style, size, bold, italic)
-    text_image = text_font.render(text, False, color)
-    screen.surface.blit(text_image, position)
-
-
 '''
 Handle the user inputs as required. The possible inputs include up arrow key,
 down arrow key, and enter key.
 
 Arguments:
-    highlighted (int): an integer (1 to 4) representing the currently 
+    highlighted (int): an integer (0 to 4) representing the currently 
                        highlighted feature
 
 Returns:
-    highlighted (int): an integer (1 to 4) representing the next 
+    highlighted (int): an integer (0 to 4) representing the next 
                        highlighted feature
     selected (bool): set to True if the user has pressed the enter key.
                      Otherwise, False.
@@ -240,11 +230,11 @@ def handle_input(highlighted):
 Move the highlight to the feature above if possible.
 
 Arguments:
-    highlighted (int): an integer (1 to 4) representing the currently 
+    highlighted (int): an integer (0 to 4) representing the currently 
                        highlighted feature
 
 Returns:
-    highlighted (int): an integer (1 to 4) representing the next 
+    highlighted (int): an integer (0 to 4) representing the next 
                        highlighted feature
 '''
 def navigate_upward(highlighted):
@@ -257,14 +247,14 @@ def navigate_upward(highlighted):
 Move the highlight to the feature below if possible.
 
 Arguments:
-    highlighted (int): an integer (1 to 4) representing the currently 
+    highlighted (int): an integer (0 to 4) representing the currently 
                        highlighted feature
 
 Returns:
-    highlighted (int): an integer (1 to 4) representing the next 
+    highlighted (int): an integer (0 to 4) representing the next 
                        highlighted feature
 '''
 def navigate_downward(highlighted):
-    if highlighted < 3:
+    if highlighted < 4:
         highlighted += 1
     return highlighted
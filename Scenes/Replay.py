@@ -0,0 +1,261 @@
+# This file contains the procedures which run the replay scene when
+# the variable "game_state" is set to 'replay'
+
+# The replay scene plays back the matches of the archive of matches, starting
+# with the last one, with the board and pieces of the match scene. Playing the
+# next move animates the falling piece as in a match, while a jump to any other
+# move (a seek) rebuilds the board at once from the keyframes of an instance of
+# Game_replay, so seeking stays instant however long the match.
+
+import pygame
+
+from Objects.Board import Board
+from Objects.Clock import Clock, wait_event
+from Objects.Game_archive import Game_archive
+from Objects.Game_replay import Game_replay
+from Objects.Position import colours
+from Objects.Text import draw_text
+
+# global identifiers each representing a RGB colour
+black = (0,0,0)
+yellow = (255, 255, 0)
+white = (255, 255, 255)
+
+# number of ticks between 2 moves when the match plays by itself
+play_delay = 25
+
+'''
+run all necessary operations associated with the replay scene.
+
+Arguments:
+    screen (Screen): an instance of pygame class Screen
+
+Returns:
+    'menu'
+'''
+def run_replay(screen):
+    archive = Game_archive()
+    if len(archive) == 0:
+        archive.close()
+        return run_empty_archive(screen)
+
+    # the state of the replay: the match shown, the number of moves played,
+    # whether it plays by itself, and the ticks left before its next move
+    state = {'game': len(archive) - 1, 'ply': 0, 'playing': True,
+             'delay': play_delay}
+    pieces = []
+    replay, board = load_game(screen, archive, state, pieces)
+
+    # the replay moves on once per tick of the clock, whatever the frame rate
+    clock = Clock()
+
+    while True:
+        # update the state of the replay, then draw it
+        action = handle_input()
+        if action == 'menu':
+            archive.close()
+            return 'menu'
+        elif action == 'previous game' or action == 'next game':
+            step = -1 if action == 'previous game' else 1
+            state['game'] = (state['game'] + step) % len(archive)
+            replay, board = load_game(screen, archive, state, pieces)
+        elif action == 'pause':
+            state['playing'] = not state['playing']
+        elif action == 'back':
+            seek(board, pieces, replay, state, state['ply'] - 1)
+        elif action == 'forward':
+            step_forward(board, pieces, replay, state)
+        elif action is not None:
+            # a fraction of the match, from 0 (start) to 1 (end)
+            seek(board, pieces, replay, state,
+                 round(action * len(replay.moves)))
+
+        for tick in range(clock.tick()):
+            # play the next move by itself every few ticks while playing
+            if state['playing'] and board.is_settled():
+                state['delay'] -= 1
+                if state['delay'] <= 0:
+                    step_forward(board, pieces, replay, state)
+
+            for piece in pieces:
+                if piece.update():
+                    board.piece_landed(piece)
+
+        draw_replay(screen, board, pieces, replay, state, len(archive))
+        pygame.display.update()
+
+        # sleep until an input arrives while nothing is moving, or until the
+        # next move when the match plays by itself
+        if not pygame.display.get_active():
+            clock.wait()
+        elif board.is_settled():
+            clock.wait(state['delay'] if state['playing'] else None)
+
+
+'''
+Load a match from the archive and show its first state.
+
+Arguments:
+    screen (Screen): an instance of pygame class Screen
+    archive (Game_archive): the archive of matches
+    state (dict): the state of the replay, holding the id of the match
+    pieces (list): all existing instances of Piece
+
+Returns:
+    replay (Game_replay): the replay of the match
+    board (Board): a new instance of class Board
+'''
+def load_game(screen, archive, state, pieces):
+    replay = Game_replay(archive.game(state['game']))
+    board = Board(screen, replay.row, replay.column, 40)
+    pieces.clear()
+    state['ply'] = 0
+    state['delay'] = play_delay
+    return replay, board
+
+
+'''
+Play the next move of the match with the falling animation. If a piece is
+still falling, the board jumps to the next state at once instead.
+
+Arguments:
+    board (Board): an instance of class Board
+    pieces (list): all existing instances of Piece
+    replay (Game_replay): the replay of the match
+    state (dict): the state of the replay
+
+Returns:
+    None
+'''
+def step_forward(board, pieces, replay, state):
+    ply = state['ply']
+    state['delay'] = play_delay
+    if ply >= len(replay.moves):
+        state['playing'] = False
+        return
+    elif not board.is_settled():
+        seek(board, pieces, replay, state, ply + 1)
+        return
+
+    move = replay.moves[ply]
+    if move is None:
+        board.record_timeout()
+    elif move < replay.column:
+        board.add_piece(pieces, move, colours[replay.player_of(ply)], 0)
+    else:
+        board.pop_piece(pieces, move - replay.column)
+    state['ply'] = ply + 1
+
+
+'''
+Jump to the state of the match after the given number of moves, without any
+animation.
+
+Arguments:
+    board (Board): an instance of class Board
+    pieces (list): all existing instances of Piece
+    replay (Game_replay): the replay of the match
+    state (dict): the state of the replay
+    ply (int): the number of moves played in the state to show
+
+Returns:
+    None
+'''
+def seek(board, pieces, replay, state, ply):
+    ply = max(0, min(ply, len(replay.moves)))
+    board.set_position(pieces, replay.position_at(ply))
+    board.moves = replay.moves[:ply]
+    state['ply'] = ply
+    state['delay'] = play_delay
+
+
+'''
+Draw the board, the pieces, and the progress of the replay onto the screen.
+
+Arguments:
+    screen (Screen): an instance of pygame class Screen
+    board (Board): an instance of class Board
+    pieces (list): all existing instances of Piece
+    replay (Game_replay): the replay of the match
+    state (dict): the state of the replay
+    games (int): the number of matches in the archive
+
+Returns:
+    None
+'''
+def draw_replay(screen, board, pieces, replay, state, games):
+    # refresh the scene
+    pygame.draw.rect(screen.surface, black, (0, 0, screen.width, screen.height))
+
+    for piece in pieces:
+        piece.draw(screen)
+    board.draw(screen)
+
+    font = 'Comic Sans Ms'
+    progress = 'Match %d/%d   move %d/%d' % (state['game'] + 1, games,
+                                               state['ply'], len(replay.moves))
+    if state['ply'] == len(replay.moves):
+        progress += '   ' + (replay.winner or 'nobody') + ' won'
+    draw_text(screen, progress, font, 30, yellow, (10, 10))
+    draw_text(screen, 'left/right: move   0-9: jump   up/down: match   '
+                      'space: pause   esc: menu', font, 20, white, (10, 60))
+
+
+'''
+Handle the user inputs. The possible inputs include the arrow keys, the number
+keys, the space key and the escape key.
+
+Arguments:
+    None
+
+Returns:
+    action (str, float or None): 'back' or 'forward' for the left or right
+                                 arrow key, 'previous game' or 'next game' for
+                                 the up or down arrow key, 'pause' for the
+                                 space key, 'menu' for the escape key, or the
+                                 fraction of the match to jump to for a number
+                                 key. None if there is no input.
+'''
+def handle_input():
+    event = pygame.event.poll()
+    if event.type != pygame.KEYDOWN:
+        return None
+    elif event.key == pygame.K_LEFT: # arrow key - left
+        return 'back'
+    elif event.key == pygame.K_RIGHT: # arrow key - right
+        return 'forward'
+    elif event.key == pygame.K_UP: # arrow key - up
+        return 'previous game'
+    elif event.key == pygame.K_DOWN: # arrow key - down
+        return 'next game'
+    elif event.key == 32: # space key
+        return 'pause'
+    elif event.key == 27: # ESC key
+        return 'menu'
+    elif 48 <= event.key <= 57: # number keys, 0 for the start of the match
+        return (event.key - 48) / 10
+    return None
+
+
+'''
+Tell the player that no match has been recorded yet, and go back to the menu
+when the enter key is pressed.
+
+Arguments:
+    screen (Screen): an instance of pygame class Screen
+
+Returns:
+    'menu'
+'''
+def run_empty_archive(screen):
+    pygame.draw.rect(screen.surface, black, (0, 0, screen.width, screen.height))
+    font = 'Comic Sans Ms'
+    draw_text(screen, 'No match recorded yet', font, 50, white, (130, 250))
+    draw_text(screen, 'Return to main menu', font, 50, yellow, (140, 400), True)
+    pygame.display.update()
+
+    # nothing moves in this scene, so it sleeps until the next input
+    while True:
+        event = wait_event()
+        if event.type == pygame.KEYDOWN and event.key == 13: # enter key
+            return 'menu'
@@ -0,0 +1,87 @@
+# This file contains the procedures which run a match between 2 instances of
+# Computer without a display
+
+# Unlike the match scene, a simulated match has no window, no animation and no
+# waiting between frames: each move is played straight on the logical state of
+# the match, an instance of Position, so the pieces land at once. The rules are
+# the ones of the referee of the class Board: a colour wins as soon as it alone
+# has a sequence of 4 pieces, and a state where both colours have one goes on.
+# A player with no legal move passes, as in the match scene, and the pass is
+# recorded as the move None, like a lost turn. A match ends in a draw when both
+# players pass in a row, or after a maximum number of moves, since a match with
+# pop-out moves may never end.
+#
+# The first moves of a match can be played at random, so computers which always
+# answer a state with the same move still play different matches. These moves
+# are drawn from a random number generator created from an explicit seed, so a
+# match simulated again with the same seed and the same computers (seeded the
+# same way) is the same match.
+#
+# Nothing in this file uses pygame, so matches can be simulated on a machine
+# with no display.
+
+import random
+
+from Objects.Position import Position
+
+'''
+Run a whole match between 2 computers, red moving first.
+
+Arguments:
+    red (Computer): the computer playing the red pieces
+    yellow (Computer): the computer playing the yellow pieces
+    row (int): the number of rows of the board
+    column (int): the number of columns of the board
+    max_moves (int): the number of moves after which the match is a draw
+    random_moves (int): the number of moves played at random at the start of
+                        the match
+    seed (int or None): the seed of the random moves. If nothing is passed, a
+                        new random number generator is seeded by the system.
+    rng (random.Random or None): the random number generator of the random
+                                 moves, used instead of a new one seeded
+                                 with the seed if passed
+    archive (Game_archive or None): the archive of matches the match is
+                                    appended to, if passed
+
+Returns:
+    moves (list): the moves played, numbered like in the method moves of
+                  Position. None for a player who passed.
+    winner (str or None): the winner of the match, either 'red' or 'yellow'.
+                          None if the match is a draw.
+'''
+def run_simulation(red, yellow, row = 6, column = 7, max_moves = 200,
+                   random_moves = 0, seed = None, rng = None,
+                   archive = None):
+    if rng is None:
+        rng = random.Random(seed)
+    position = Position(row, column)
+    computers = (red, yellow)
+    moves = []
+    winner = None
+    player = 0
+    while len(moves) < max_moves:
+        drops = []
+        if len(moves) < random_moves:
+            # the random moves only drop pieces, as in a usual opening
+            drops = position.moves(player, False)
+        if drops:
+            move = rng.choice(drops)
+        else:
+            move = computers[player].choose_move(position, player)
+        moves.append(move)
+
+        if move is None:
+            # the player has no legal move and passes
+            if len(moves) >= 2 and moves[-2] is None:
+                break
+        else:
+            position.play(move, player)
+            winner = position.winner()
+            if winner == 'red' or winner == 'yellow':
+                break
+            winner = None
+        player = 1 - player
+
+    if archive is not None:
+        archive.append(moves, winner, 'simulation', seed, row, column)
+    return moves, winner
@@ -0,0 +1,216 @@
+# This file contains the benchmarks of the game engine. Run it from the folder
+# containing the file "Connect4.py", for example:
+#
+#     python3 -m Tools.Benchmark parallel --depth 8 --workers 4
+#     python3 -m Tools.Benchmark mcts --playouts 1000 4000 16000
+#     python3 -m Tools.Benchmark winners --states 10000
+
+import argparse
+import random
+import time
+
+from Objects.Engine import Engine
+from Objects.Mcts import Mcts
+from Objects.Parallel_engine import Parallel_engine
+from Objects.Position import Position
+from Objects.Transposition_table import Transposition_table
+
+# fixed workload of the benchmarks, each state given as the columns played from
+# an empty board, red first
+workload = ['', '3', '33', '3232', '332244', '3325641', '33221155']
+
+'''
+Build the states of the workload.
+
+Arguments:
+    None
+
+Returns:
+    states (list): a tuple of an instance of Position and the player to move
+                   for each state of the workload
+'''
+def workload_states():
+    states = []
+    for moves in workload:
+        position = Position()
+        for i, column in enumerate(moves):
+            position.drop(int(column), i % 2)
+        states.append((position, len(moves) % 2))
+    return states
+
+
+'''
+Search every state of the workload to a fixed depth, first on a single core,
+then spread over a pool of worker processes, and print the time taken, the
+nodes per second and the speedup.
+
+Arguments:
+    depth (int): the number of moves to look ahead
+    workers (int): the number of worker processes
+
+Returns:
+    speedup (float): time taken on a single core divided by the time taken by
+                     the worker processes
+'''
+def benchmark_parallel(depth, workers):
+    states = workload_states()
+    engines = [('1 core', Engine(Transposition_table())),
+               ('%d workers' % workers, Parallel_engine(workers))]
+
+    # start the worker processes before measuring
+    engines[1][1].best_move(Position(), 0, 1)
+
+    times = []
+    for name, engine in engines:
+        seconds = 0
+        nodes = 0
+        for position, player in states:
+            start = time.perf_counter()
+            engine.best_move(position, player, depth)
+            seconds += time.perf_counter() - start
+            nodes += engine.nodes
+        times.append(seconds)
+        print('%-12s %8.3f s %12d nodes %10.0f nodes/s'
+              % (name, seconds, nodes, nodes / seconds))
+
+    engines[1][1].shutdown()
+    speedup = times[0] / times[1]
+    print('speedup      %8.2f x' % speedup)
+    return speedup
+
+
+'''
+Search every state of the workload with a Monte Carlo tree search for each of
+the given playout budgets, and print the time taken and the playouts per
+second.
+
+Arguments:
+    budgets (list): the numbers of playouts of each search
+    batch (int): the number of playouts advanced together
+    seed (int): the seed of the random playouts, so every run plays the same
+                playouts
+
+Returns:
+    rates (list): the playouts per second reached with each budget
+'''
+def benchmark_mcts(budgets, batch, seed = 0):
+    states = workload_states()
+    rates = []
+    for playouts in budgets:
+        seconds = 0
+        nodes = 0
+        for position, player in states:
+            # a new tree for each state, so no playout is reused
+            engine = Mcts(playouts, batch, rng = random.Random(seed))
+            engine.best_move(position, player)
+            seconds += engine.elapsed
+            nodes += engine.nodes
+        rates.append(nodes / seconds)
+        print('%8d playouts %8.3f s %10.0f playouts/s'
+              % (playouts, seconds, nodes / seconds))
+    return rates
+
+
+'''
+Build states by playing random moves, drops and pops, from an empty board,
+stopping at a random number of moves or at the end of the match.
+
+Arguments:
+    count (int): the number of states
+    seed (int): the seed of the random moves
+
+Returns:
+    positions (list): the instances of Position of the states
+'''
+def random_states(count, seed = 0):
+    rng = random.Random(seed)
+    positions = []
+    for n in range(count):
+        position = Position()
+        player = 0
+        for i in range(rng.randrange(60)):
+            if position.winner() in ('red', 'yellow'):
+                break
+            position.play(rng.choice(position.moves(player)), player)
+            player = 1 - player
+        positions.append(position)
+    return positions
+
+
+'''
+Determine the winner of random states, first by looping the method winner of
+Position, then in a single vectorized pass over an array of boards and over
+an array of bitboards, and print the time taken and the speedup of each. The
+results of the 3 methods are checked to be the same.
+
+Arguments:
+    count (int): the number of states
+    seed (int): the seed of the random states
+
+Returns:
+    speedups (tuple): time taken by the loop divided by the time taken by the
+                      vectorized pass over the boards and over the bitboards
+'''
+def benchmark_winners(count, seed = 0):
+    # NumPy is only needed by this benchmark
+    from Objects import Batch_referee
+
+    positions = random_states(count, seed)
+    boards = Batch_referee.to_boards(positions)
+    masks = Batch_referee.to_bitboards(positions)
+    codes = {None: Batch_referee.none, 'red': Batch_referee.red_wins,
+             'yellow': Batch_referee.yellow_wins, 'tied': Batch_referee.tied}
+    Batch_referee.line_masks(6, 7)
+
+    start = time.perf_counter()
+    looped = [codes[position.winner()] for position in positions]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from_boards = Batch_referee.board_winners(boards)
+    boards_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from_bitboards = Batch_referee.bitboard_winners(masks)
+    bitboards_time = time.perf_counter() - start
+
+    assert list(from_boards) == looped and list(from_bitboards) == looped
+
+    for name, seconds in (('loop', loop_time), ('boards', boards_time),
+                          ('bitboards', bitboards_time)):
+        print('%-12s %8.4f s %12.0f states/s %8.1f x'
+              % (name, seconds, count / seconds, loop_time / seconds))
+    return loop_time / boards_time, loop_time / bitboards_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Connect 4 benchmarks')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    parallel = commands.add_parser('parallel',
+                                   help = 'root-parallel search speedup')
+    parallel.add_argument('--depth', type = int, default = 8)
+    parallel.add_argument('--workers', type = int, default = 4)
+
+    mcts = commands.add_parser('mcts', help = 'Monte Carlo playouts per second')
+    mcts.add_argument('--playouts', type = int, nargs = '+',
+                      default = [1000, 4000, 16000])
+    mcts.add_argument('--batch', type = int, default = 8)
+    mcts.add_argument('--seed', type = int, default = 0)
+
+    winners = commands.add_parser('winners',
+                                  help = 'vectorized winner of many states')
+    winners.add_argument('--states', type = int, default = 10000)
+    winners.add_argument('--seed', type = int, default = 0)
+
+    args = parser.parse_args()
+    if args.command == 'parallel':
+        benchmark_parallel(args.depth, args.workers)
+    elif args.command == 'mcts':
+        benchmark_mcts(args.playouts, args.batch, args.seed)
+    elif args.command == 'winners':
+        benchmark_winners(args.states, args.seed)
+
+
+if __name__ == "__main__":
+    main()
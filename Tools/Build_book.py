@@ -0,0 +1,98 @@
+# This file contains the procedures which build the opening book used by the
+# class Computer. Run it from the folder containing the file "Connect4.py",
+# for example:
+#
+#     python3 -m Tools.Build_book --plies 5 --time 1
+#
+# Every state reachable by dropping pieces during the first moves of a match
+# (red first) is searched in advance, once per pair of mirrored states, and the
+# best moves are written to a book file sorted by key.
+
+import argparse
+import time
+
+from Objects.Engine import Engine
+from Objects.Opening_book import book_key, default_path, mirror_move, \
+                                 write_book
+from Objects.Position import Position
+from Objects.Transposition_table import Transposition_table
+
+'''
+Collect the states reachable by dropping pieces from an empty board, keeping a
+single state of each pair of mirrored states. States where the match is over
+are left out.
+
+Arguments:
+    plies (int): the number of moves played to reach the last states collected
+    row (int): the number of rows
+    column (int): the number of columns
+
+Returns:
+    states (dict): a tuple of an instance of Position and the player to move,
+                   keyed by the key returned by book_key
+'''
+def opening_states(plies, row, column):
+    states = {}
+    layer = [Position(row, column)]
+    for ply in range(plies):
+        player = ply % 2
+        next_layer = []
+        for position in layer:
+            key, mirrored = book_key(position, player)
+            if key in states:
+                continue
+            states[key] = (position, player)
+
+            for c in range(column):
+                if position.can_drop(c):
+                    after = position.copy()
+                    after.drop(c, player)
+                    if after.winner() is None:
+                        next_layer.append(after)
+        layer = next_layer
+    return states
+
+
+'''
+Search every state of the first moves of a match and write the book file.
+
+Arguments:
+    path (str): location of the book file
+    plies (int): the number of moves covered by the book
+    depth (int): the maximum number of moves to look ahead
+    time_budget (float): the number of seconds each state may be searched
+
+Returns:
+    None
+'''
+def build_book(path, plies, depth, time_budget):
+    engine = Engine(Transposition_table(64 * 1024 * 1024))
+    states = opening_states(plies, 6, 7)
+    entries = {}
+    start = time.perf_counter()
+    for i, (key, (position, player)) in enumerate(sorted(states.items())):
+        move, score = engine.best_move(position, player, depth, time_budget)
+        # the book holds the move of the state owning the key
+        if book_key(position, player)[1]:
+            move = mirror_move(move, position.column)
+        entries[key] = move
+        print('%5d/%d  depth %2d  move %2d  score %8s'
+              % (i + 1, len(states), engine.depth, move, score))
+
+    write_book(path, entries, 6, 7)
+    print('%d states written to %s in %.1f s'
+          % (len(entries), path, time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Build the opening book')
+    parser.add_argument('--plies', type = int, default = 5)
+    parser.add_argument('--depth', type = int, default = 42)
+    parser.add_argument('--time', type = float, default = 1.0)
+    parser.add_argument('--output', default = default_path)
+    args = parser.parse_args()
+    build_book(args.output, args.plies, args.depth, args.time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# This file contains the procedures which export the states of recorded or
+# simulated matches as training data for evaluation functions. Run it from the
+# folder containing the file "Connect4.py", for example:
+#
+#     python3 -m Tools.Export_training --archive Data/games.bin --output shards
+#     python3 -m Tools.Export_training --simulate 1000 --depth 4 --mirror
+#
+# Every state reached in a match, before each move, becomes a sample holding:
+#
+#     planes: the red and yellow pieces, shape (2, rows, columns), rows counted
+#             from the bottom, 1 for a piece and 0 for an empty cell
+#     side: the player to move, 0 for red, 1 for yellow
+#     result: the final result of the match for the player to move, 1 for a
+#             win, 0 for a draw, -1 for a loss
+#     value: the score of the state for the player to move found by a search
+#            of the class Engine, NaN if no search is asked for
+#
+# The matches are read one at a time and their samples are passed along by
+# generators, so only the current match and the current shard are ever held in
+# memory, however many matches are exported. The samples are written in shards
+# of a fixed number of samples, each an array with named fields saved with
+# numpy.save as "shard-00000.npy", "shard-00001.npy", and so on. A shard can be
+# loaded with numpy.load, with mmap_mode = 'r' to read it lazily. This tool
+# needs the NumPy module.
+
+import argparse
+import os
+
+import numpy
+
+from Objects.Engine import Engine
+from Objects.Game_archive import Game_archive
+from Objects.Position import Position
+from Objects.Transposition_table import Transposition_table
+from Tournament import play_game
+
+'''
+Return the type of the samples of a board.
+
+Arguments:
+    row (int): the number of rows
+    column (int): the number of columns
+
+Returns:
+    dtype (numpy.dtype): the fields of a sample
+'''
+def sample_type(row, column):
+    return numpy.dtype([('planes', numpy.int8, (2, row, column)),
+                        ('side', numpy.int8), ('result', numpy.int8),
+                        ('value', numpy.float32)])
+
+
+'''
+Read the matches of an archive of matches one at a time.
+
+Arguments:
+    path (str): location of the archive
+
+Yields:
+    record (dict): the record of a match, as returned by the method game of
+                   Game_archive
+'''
+def archived_games(path):
+    archive = Game_archive(path)
+    try:
+        for game in range(len(archive)):
+            yield archive.game(game)
+    finally:
+        archive.close()
+
+
+'''
+Simulate matches between 2 computers one at a time, seeded like the matches of
+a tournament.
+
+Arguments:
+    count (int): the number of matches
+    red (str): the description of the red player, as for Tournament.py
+    yellow (str): the description of the yellow player
+    random_moves (int): the number of moves played at random at the start of
+                        each match
+    seed (int): the seed of the first match, increased by 1 for each match
+
+Yields:
+    record (dict): the record of a match, as returned by play_game of
+                   Tournament.py, with the rows and columns of the board
+'''
+def simulated_games(count, red, yellow, random_moves, seed):
+    for game in range(count):
+        record = play_game(game, red, yellow, seed + game, 200, random_moves)
+        record['row'] = 6
+        record['column'] = 7
+        yield record
+
+
+'''
+Turn matches into samples, one for each state before a move.
+
+Arguments:
+    games (iterable): the records of the matches
+    depth (int): the number of moves searched ahead for the value of each
+                 state. 0 for no search.
+    mirror (bool): also produce the mirror image of each sample if set to True
+
+Yields:
+    sample (tuple): the planes, side, result and value of a state
+'''
+def game_samples(games, depth = 0, mirror = False):
+    engine = Engine(Transposition_table()) if depth else None
+    for record in games:
+        row, column = record['row'], record['column']
+        winner = ('red', 'yellow').index(record['winner']) \
+                 if record['winner'] else None
+        position = Position(row, column)
+        for ply, move in enumerate(record['moves']):
+            player = ply % 2
+            planes = numpy.zeros((2, row, column), numpy.int8)
+            for c in range(column):
+                for r in range(position.heights[c]):
+                    planes[position.owner(c, r), r, c] = 1
+            if winner is None:
+                result = 0
+            else:
+                result = 1 if winner == player else -1
+            value = None
+            if engine is not None:
+                value = engine.best_move(position, player, depth)[1]
+            if value is None:
+                value = numpy.nan
+
+            yield planes, player, result, value
+            if mirror:
+                yield planes[:, :, ::-1], player, result, value
+            if move is not None:
+                position.play(move, player)
+
+
+'''
+Write samples to shards of a fixed size. Only a single shard is held in memory.
+
+Arguments:
+    samples (iterable): the planes, side, result and value of each sample
+    directory (str): the folder of the shards, created if missing
+    shard_size (int): the number of samples of each shard, the last shard
+                      holding the remaining ones
+    row (int): the number of rows
+    column (int): the number of columns
+
+Returns:
+    count (int): the number of samples written
+'''
+def write_shards(samples, directory, shard_size, row = 6, column = 7):
+    os.makedirs(directory, exist_ok = True)
+    shard = numpy.zeros(shard_size, sample_type(row, column))
+    shards = 0
+    filled = 0
+    count = 0
+    for planes, side, result, value in samples:
+        shard[filled] = (planes, side, result, value)
+        filled += 1
+        count += 1
+        if filled == shard_size:
+            numpy.save(os.path.join(directory, 'shard-%05d.npy' % shards),
+                       shard)
+            shards += 1
+            filled = 0
+
+    if filled:
+        numpy.save(os.path.join(directory, 'shard-%05d.npy' % shards),
+                   shard[:filled])
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Export training data')
+    source = parser.add_mutually_exclusive_group(required = True)
+    source.add_argument('--archive', help = 'archive of matches to export')
+    source.add_argument('--simulate', type = int,
+                        help = 'number of matches to simulate')
+    parser.add_argument('--players', nargs = 2,
+                        default = ['alphabeta:time=0.05', 'alphabeta:time=0.05'])
+    parser.add_argument('--random-moves', type = int, default = 4)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--depth', type = int, default = 0)
+    parser.add_argument('--mirror', action = 'store_true')
+    parser.add_argument('--shard-size', type = int, default = 65536)
+    parser.add_argument('--output', default = 'training')
+    args = parser.parse_args()
+
+    if args.archive:
+        games = archived_games(args.archive)
+    else:
+        games = simulated_games(args.simulate, args.players[0],
+                                args.players[1], args.random_moves, args.seed)
+    count = write_shards(game_samples(games, args.depth, args.mirror),
+                         args.output, args.shard_size)
+    print('%d samples written to %s' % (count, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# This file contains the perft tool, which counts the states reached by every
+# sequence of legal moves of a given length (the leaves of the tree of moves).
+# Run it from the folder containing the file "Connect4.py", for example:
+#
+#     python3 -m Tools.Perft --depth 6
+#     python3 -m Tools.Perft --depth 5 --pop-out --moves 3344 --divide
+#     python3 -m Tools.Perft --check
+#
+# The moves are generated and played by the class Position, and a match stops
+# as soon as a colour alone has a sequence of 4, as judged by the method winner
+# of Position. The counts therefore change if the move generation or the rules
+# change, so they are checked against the reference counts below, and the
+# number of leaves per second measures the speed of the rules.
+
+import argparse
+import time
+
+from Objects.Position import Position
+
+# reference counts from an empty board, keyed by (pop_out, depth), checked
+# against a separate implementation of the rules on a plain grid
+references = {
+    (False, 1): 7,
+    (False, 2): 49,
+    (False, 3): 343,
+    (False, 4): 2401,
+    (False, 5): 16807,
+    (False, 6): 117649,
+    (False, 7): 823536,
+    (False, 8): 5673234,
+    (True, 1): 7,
+    (True, 2): 49,
+    (True, 3): 392,
+    (True, 4): 3087,
+    (True, 5): 26320,
+    (True, 6): 220626,
+}
+
+'''
+Count the leaves of the tree of moves of the given depth from a state. A state
+where the match is over has no moves.
+
+Arguments:
+    position (Position): the state to start from
+    player (int): the player to move, 0 for red, 1 for yellow
+    depth (int): the number of moves of each sequence
+    pop_out (bool): generate the pop-out moves if set to True
+
+Returns:
+    leaves (int): the number of leaves
+'''
+def perft(position, player, depth, pop_out):
+    if depth == 0:
+        return 1
+
+    leaves = 0
+    for move in position.moves(player, pop_out):
+        after = position.copy()
+        after.play(move, player)
+        if depth == 1:
+            leaves += 1
+        elif after.winner() not in ('red', 'yellow'):
+            leaves += perft(after, 1 - player, depth - 1, pop_out)
+    return leaves
+
+
+'''
+Count the leaves below each move of a state, to find which move differs from
+another count.
+
+Arguments:
+    position (Position): the state to start from
+    player (int): the player to move, 0 for red, 1 for yellow
+    depth (int): the number of moves of each sequence
+    pop_out (bool): generate the pop-out moves if set to True
+
+Returns:
+    divide (dict): the number of leaves below each move
+'''
+def divide(position, player, depth, pop_out):
+    counts = {}
+    for move in position.moves(player, pop_out):
+        after = position.copy()
+        after.play(move, player)
+        if depth == 1 or after.winner() in ('red', 'yellow'):
+            counts[move] = 1 if depth == 1 else 0
+        else:
+            counts[move] = perft(after, 1 - player, depth - 1, pop_out)
+    return counts
+
+
+'''
+Build a state from the moves played from an empty board, red first.
+
+Arguments:
+    moves (str): the columns the pieces are dropped into, for example '3344'
+
+Returns:
+    position (Position): the state after the moves
+    player (int): the player to move
+'''
+def from_moves(moves):
+    position = Position()
+    for i, column in enumerate(moves):
+        position.drop(int(column), i % 2)
+    return position, len(moves) % 2
+
+
+'''
+Count the leaves of every reference count up to the given depth, and print
+whether each count matches, with the number of leaves per second.
+
+Arguments:
+    max_depth (int): the deepest reference count checked
+
+Returns:
+    True if every count matches. Otherwise, False.
+'''
+def check(max_depth):
+    matching = True
+    for (pop_out, depth), expected in sorted(references.items()):
+        if depth > max_depth:
+            continue
+        start = time.perf_counter()
+        leaves = perft(Position(), 0, depth, pop_out)
+        seconds = time.perf_counter() - start
+        matching = matching and leaves == expected
+        print('pop-out %-5s depth %d %10d leaves %-8s %10.0f leaves/s'
+              % (pop_out, depth, leaves,
+                 'ok' if leaves == expected else 'expected %d' % expected,
+                 leaves / seconds))
+    return matching
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Count the leaves of the '
+                                                   'tree of moves')
+    parser.add_argument('--depth', type = int, default = 6)
+    parser.add_argument('--pop-out', action = 'store_true')
+    parser.add_argument('--moves', default = '',
+                        help = 'columns played from an empty board')
+    parser.add_argument('--divide', action = 'store_true',
+                        help = 'count the leaves below each move')
+    parser.add_argument('--check', action = 'store_true',
+                        help = 'check the reference counts up to --depth')
+    args = parser.parse_args()
+
+    if args.check:
+        if not check(args.depth):
+            raise SystemExit('perft: counts differ from the references')
+        return
+
+    position, player = from_moves(args.moves)
+    start = time.perf_counter()
+    if args.divide:
+        counts = divide(position, player, args.depth, args.pop_out)
+        for move, leaves in counts.items():
+            print('%2d %10d' % (move, leaves))
+        leaves = sum(counts.values())
+    else:
+        leaves = perft(position, player, args.depth, args.pop_out)
+    seconds = time.perf_counter() - start
+    print('depth %d: %d leaves in %.3f s, %.0f leaves/s'
+          % (args.depth, leaves, seconds, leaves / seconds))
+
+    if not args.moves and (args.pop_out, args.depth) in references:
+        expected = references[(args.pop_out, args.depth)]
+        print('reference: %d (%s)'
+              % (expected, 'ok' if leaves == expected else 'MISMATCH'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+##########################################
+###### RUN THIS FILE FOR TOURNAMENTS #####
+##########################################
+
+# This file runs a tournament between computers with different engines and
+# settings, simulating their matches without a display (see the file
+# "Scenes/Simulation.py") over a pool of worker processes. For example:
+#
+#     python3 Tournament.py alphabeta:time=0.05 mcts:playouts=2000 \
+#         --games 100 --output results.jsonl
+#
+# Each player is given as an engine, 'alphabeta' or 'mcts', optionally followed
+# by settings of the class Computer: time (seconds per move, or 'none' to limit
+# the search by depth or playouts only), depth and playouts. Every pair of
+# players plays the given number of matches, each player taking the red pieces
+# in half of them.
+#
+# Each match has its own seed, from which the random first moves of the match
+# and the random number generators of both computers are drawn. The seed is
+# written with the results of the match, and a match played again with the
+# same seed is the same match, as long as no player is limited by time.
+#
+# Each finished match is written at once to the output file as a line of JSON,
+# so the results are never held in memory. Running the same command again
+# resumes an interrupted tournament: the matches already in the file are not
+# played again. Once every match is played, the wins, draws and losses of each
+# pair are counted from the file, with an estimate of the Elo difference and
+# its 95% confidence interval. The matches can also be appended to an archive
+# of matches (see the file "Objects/Game_archive.py") as they end.
+
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import random
+import time
+
+from Objects.Computer import Computer
+from Objects.Game_archive import Game_archive, no_seed
+from Scenes.Simulation import run_simulation
+
+'''
+Read a time budget given with a player.
+
+Arguments:
+    value (str): a number of seconds, or 'none' for no time limit
+
+Returns:
+    seconds (float or None): the time budget
+'''
+def seconds(value):
+    if value == 'none':
+        return None
+    return float(value)
+
+
+# settings of the class Computer which can be given with a player
+settings = {'time': ('time_budget', seconds), 'depth': ('depth', int),
+            'playouts': ('playouts', int)}
+
+'''
+Create a computer from its description.
+
+Arguments:
+    player (str): an engine, optionally followed by ':' and settings given as
+                  'name=value' separated by ',', for example
+                  'mcts:time=0.1,playouts=5000'
+    seed (int or None): the seed of the random number generator of the computer
+
+Returns:
+    computer (Computer): the instance of Computer described
+'''
+def make_computer(player, seed = None):
+    engine, _, options = player.partition(':')
+    arguments = {'time_budget': 0.05, 'seed': seed}
+    for option in filter(None, options.split(',')):
+        name, _, value = option.partition('=')
+        if name not in settings:
+            raise ValueError('unknown setting in player ' + player + ': ' + name)
+        argument, kind = settings[name]
+        arguments[argument] = kind(value)
+    return Computer(engine = engine, **arguments)
+
+
+'''
+List the matches of a tournament: every pair of players plays the given number
+of matches, swapping colours after each match. The seed of each match is the
+seed of the tournament plus the number of the match.
+
+Arguments:
+    players (list): the descriptions of the players
+    games (int): the number of matches of each pair of players
+    seed (int): the seed of the tournament
+
+Returns:
+    schedule (list): the number, red player, yellow player and seed of each
+                     match
+'''
+def make_schedule(players, games, seed):
+    schedule = []
+    for i, first in enumerate(players):
+        for second in players[i + 1:]:
+            for game in range(games):
+                if game % 2 == 0:
+                    red, yellow = first, second
+                else:
+                    red, yellow = second, first
+                schedule.append((len(schedule), red, yellow,
+                                 seed + len(schedule)))
+    return schedule
+
+
+'''
+Play a single match of the tournament. This function is run in a worker
+process.
+
+Arguments:
+    game (int): the number of the match in the schedule
+    red (str): the description of the red player
+    yellow (str): the description of the yellow player
+    seed (int): the seed of the match
+    max_moves (int): the number of moves after which the match is a draw
+    random_moves (int): the number of moves played at random at the start of
+                        the match
+
+Returns:
+    record (dict): the number of the match, its players, its seed, the moves
+                   played, the winner (None for a draw) and the time taken in
+                   seconds
+'''
+def play_game(game, red, yellow, seed, max_moves, random_moves):
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    computers = (make_computer(red, rng.getrandbits(32)),
+                 make_computer(yellow, rng.getrandbits(32)))
+    moves, winner = run_simulation(computers[0], computers[1],
+                                   max_moves = max_moves,
+                                   random_moves = random_moves, rng = rng)
+    for computer in computers:
+        computer.close()
+    return {'game': game, 'red': red, 'yellow': yellow, 'seed': seed,
+            'moves': moves, 'winner': winner,
+            'seconds': time.perf_counter() - start}
+
+
+'''
+Read the matches already written to the output file. A line left incomplete
+by an interrupted run is dropped from the file.
+
+Arguments:
+    path (str): location of the output file
+
+Returns:
+    records (list): the record of each match in the file
+'''
+def read_records(path):
+    if not os.path.exists(path):
+        return []
+
+    records = []
+    complete = True
+    with open(path) as results:
+        for line in results:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                complete = False
+
+    if not complete:
+        with open(path, 'w') as results:
+            for record in records:
+                results.write(json.dumps(record) + '\n')
+    return records
+
+
+'''
+Play the matches of the schedule missing from the output file over a pool of
+worker processes, appending each match to the file as soon as it ends, and
+print the number of matches played per second.
+
+Arguments:
+    schedule (list): the number, red player, yellow player and seed of each
+                     match
+    path (str): location of the output file
+    workers (int): the number of worker processes
+    max_moves (int): the number of moves after which a match is a draw
+    random_moves (int): the number of moves played at random at the start of
+                        each match
+    archive (Game_archive or None): the archive of matches each match is
+                                    appended to, if passed
+
+Returns:
+    played (int): the number of matches played
+'''
+def run_tournament(schedule, path, workers, max_moves, random_moves,
+                   archive = None):
+    done = set()
+    for record in read_records(path):
+        game = record['game']
+        if game >= len(schedule) or schedule[game][1:] != \
+           (record['red'], record['yellow'], record.get('seed')):
+            raise ValueError(path + ' holds the results of another tournament')
+        done.add(game)
+    remaining = [match for match in schedule if match[0] not in done]
+    if done:
+        print('resuming: %d of %d matches already played'
+              % (len(done), len(schedule)))
+
+    start = time.perf_counter()
+    played = 0
+    with open(path, 'a') as results, \
+         concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(play_game, game, red, yellow, seed, max_moves,
+                               random_moves)
+                   for game, red, yellow, seed in remaining]
+        for future in concurrent.futures.as_completed(futures):
+            record = future.result()
+            results.write(json.dumps(record) + '\n')
+            results.flush()
+            if archive is not None:
+                archive.append(record['moves'], record['winner'],
+                               'simulation', record['seed'])
+            played += 1
+            if played % 10 == 0 or played == len(remaining):
+                seconds = time.perf_counter() - start
+                print('%6d/%d matches %8.1f s %8.2f matches/s'
+                      % (len(done) + played, len(schedule), seconds,
+                         played / seconds))
+    return played
+
+
+'''
+Estimate the Elo difference between 2 players from the score of the first,
+with the 95% confidence interval given by the spread of the results.
+
+Arguments:
+    wins (int): the number of matches won by the first player
+    draws (int): the number of draws
+    losses (int): the number of matches lost by the first player
+
+Returns:
+    elo (float): the estimated Elo difference
+    low (float): the lower bound of the confidence interval
+    high (float): the upper bound of the confidence interval
+'''
+def elo_difference(wins, draws, losses):
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins + draws / 4) / games - score * score
+    margin = 1.96 * math.sqrt(max(variance, 0) / games)
+
+    def elo(score):
+        if score <= 0:
+            return -math.inf
+        elif score >= 1:
+            return math.inf
+        return 400 * math.log10(score / (1 - score))
+
+    return elo(score), elo(score - margin), elo(score + margin)
+
+
+'''
+Count the wins, draws and losses of each pair of players from the output file
+and print them with the Elo difference between the players.
+
+Arguments:
+    path (str): location of the output file
+
+Returns:
+    pairs (dict): the wins, draws and losses of the first player of each pair,
+                  keyed by the pair of players
+'''
+def report(path):
+    pairs = {}
+    for record in read_records(path):
+        first, second = sorted((record['red'], record['yellow']))
+        counts = pairs.setdefault((first, second), [0, 0, 0])
+        if record['winner'] is None:
+            counts[1] += 1
+        elif record[record['winner']] == first:
+            counts[0] += 1
+        else:
+            counts[2] += 1
+
+    for (first, second), (wins, draws, losses) in sorted(pairs.items()):
+        elo, low, high = elo_difference(wins, draws, losses)
+        print('%s vs %s: %d wins %d draws %d losses, Elo %+.0f [%+.0f, %+.0f]'
+              % (first, second, wins, draws, losses, elo, low, high))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Connect 4 tournament')
+    parser.add_argument('players', nargs = '+')
+    parser.add_argument('--games', type = int, default = 100)
+    parser.add_argument('--workers', type = int, default = os.cpu_count())
+    parser.add_argument('--max-moves', type = int, default = 200)
+    parser.add_argument('--random-moves', type = int, default = 2)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--archive', help = 'archive of matches to append to')
+    parser.add_argument('--output', default = 'tournament.jsonl')
+    args = parser.parse_args()
+
+    # check the players before starting the worker processes
+    for player in args.players:
+        make_computer(player).close()
+
+    schedule = make_schedule(args.players, args.games, args.seed)
+    # the seed of each match is archived with it
+    if args.seed < 0 or args.seed + len(schedule) > no_seed:
+        parser.error('the seeds of the matches must be from 0 to 2**64 - 2')
+    archive = Game_archive(args.archive) if args.archive else None
+    run_tournament(schedule, args.output, args.workers, args.max_moves,
+                   args.random_moves, archive)
+    if archive is not None:
+        archive.close()
+    report(args.output)
+
+
+if __name__ == "__main__":
+    main()